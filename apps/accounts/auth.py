@@ -1,11 +1,60 @@
 from django.conf import settings
 from apps.accounts.models import Jwt
+from apps.common.broadcast import broadcast
+from apps.common.cache import LRUCache
 from datetime import datetime, timedelta
-import jwt, random, string
+import copy, jwt, random, string, threading
 
 ALGORITHM = "HS256"
 
 
+class TokenCache:
+    """
+    Maps user ids to their last validated access token and user, so auth can skip the Jwt query.
+    Entries expire after AUTH_TOKEN_CACHE_TTL seconds and are evicted in every worker,
+    through the broadcast, whenever the user's Jwt row or the user itself changes.
+    """
+
+    channel = "auth-tokens"
+
+    def __init__(self, maxsize, ttl):
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.lock = threading.Lock()
+        self.registered = False
+        # Bumped on every eviction, so lookups racing one are not cached
+        self.generation = 0
+
+    def get(self, user_id, token):
+        entry = self.cache.get(user_id)
+        if entry is None or entry[0] != token:
+            return None
+        # A copy, so changes made while handling a request never leak into the cache
+        return copy.copy(entry[1])
+
+    def set(self, user_id, token, user, generation):
+        with self.lock:
+            if not self.registered:
+                broadcast.subscribe(self.channel, self.evict)
+                self.registered = True
+            if generation == self.generation:
+                self.cache.set(user_id, (token, user))
+
+    def evict(self, message):
+        with self.lock:
+            self.generation += 1
+            self.cache.delete(message["user_id"])
+
+    def evict_user(self, user_id):
+        message = {"user_id": str(user_id)}
+        self.evict(message)
+        broadcast.publish(self.channel, message)
+
+
+token_cache = TokenCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL
+)
+
+
 class Authentication:
     # generate random string
     def get_random(length: int):
@@ -39,15 +88,24 @@ class Authentication:
             decoded = False
         return decoded
 
-    def decodeAuthorization(token: str):
+    async def decodeAuthorization(token: str):
         decoded = Authentication.decode_jwt(token[7:])
         if not decoded:
             return None
+        user_id = decoded["user_id"]
+        user = token_cache.get(user_id, token)
+        if user:
+            return user
+
+        generation = token_cache.generation
         jwt_obj = (
-            Jwt.objects.filter(user_id=decoded["user_id"])
+            await Jwt.objects.filter(
+                access_digest=Jwt.digest(token[7:]), user_id=user_id
+            )
             .select_related("user", "user__avatar")
-            .first()
+            .afirst()
         )
         if not jwt_obj:
             return None
+        token_cache.set(user_id, token, jwt_obj.user, generation)
         return jwt_obj.user
@@ -1,83 +1,46 @@
 from django.template.loader import render_to_string
-from django.core.mail import EmailMessage
 from . import models as accounts_models
-import random, threading
-
-
-class EmailThread(threading.Thread):
-    def __init__(self, email):
-        self.email = email
-        threading.Thread.__init__(self)
-
-    def run(self):
-        self.email.send()
+import random
 
 
 class Util:
-    async def send_activation_otp(user):
-        subject = "Verify your email"
-        code = random.randint(100000, 999999)
-        message = render_to_string(
-            "email-activation.html",
-            {
-                "name": user.full_name,
-                "otp": code,
-            },
+    # Emails are queued in the outbox and sent by the `send_emails` workers
+    async def queue_email(user, subject, template, context):
+        await accounts_models.OutboxEmail.objects.acreate(
+            to=user.email,
+            subject=subject,
+            body=render_to_string(template, {"name": user.full_name, **context}),
         )
+
+    async def set_otp(user):
+        code = random.randint(100000, 999999)
         otp = await accounts_models.Otp.objects.get_or_none(user=user)
         if not otp:
             await accounts_models.Otp.objects.acreate(user=user, code=code)
         else:
             otp.code = code
             await otp.asave()
+        return code
 
-        email_message = EmailMessage(subject=subject, body=message, to=[user.email])
-        email_message.content_subtype = "html"
-        EmailThread(email_message).start()
+    async def send_activation_otp(user):
+        code = await Util.set_otp(user)
+        await Util.queue_email(
+            user, "Verify your email", "email-activation.html", {"otp": code}
+        )
 
     async def send_password_change_otp(user):
-        subject = "Your account password reset email"
-        code = random.randint(100000, 999999)
-        message = render_to_string(
+        code = await Util.set_otp(user)
+        await Util.queue_email(
+            user,
+            "Your account password reset email",
             "password-reset.html",
-            {
-                "name": user.full_name,
-                "otp": code,
-            },
+            {"otp": code},
         )
-        otp = await accounts_models.Otp.objects.get_or_none(user=user)
-        if not otp:
-            await accounts_models.Otp.objects.acreate(user=user, code=code)
-        else:
-            otp.code = code
-            await otp.asave()
-
-        email_message = EmailMessage(subject=subject, body=message, to=[user.email])
-        email_message.content_subtype = "html"
 
-        EmailThread(email_message).start()
-
-    def password_reset_confirmation(user):
-        subject = "Password Reset Successful!"
-        message = render_to_string(
-            "password-reset-success.html",
-            {
-                "name": user.full_name,
-            },
+    async def password_reset_confirmation(user):
+        await Util.queue_email(
+            user, "Password Reset Successful!", "password-reset-success.html", {}
         )
-        email_message = EmailMessage(subject=subject, body=message, to=[user.email])
-        email_message.content_subtype = "html"
-        EmailThread(email_message).start()
 
-    @staticmethod
-    def welcome_email(user):
-        subject = "Account verified!"
-        message = render_to_string(
-            "welcome.html",
-            {
-                "name": user.full_name,
-            },
-        )
-        email_message = EmailMessage(subject=subject, body=message, to=[user.email])
-        email_message.content_subtype = "html"
-        EmailThread(email_message).start()
+    async def welcome_email(user):
+        await Util.queue_email(user, "Account verified!", "welcome.html", {})
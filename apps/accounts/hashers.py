@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from apps.common.exceptions import RequestError
+import asyncio, logging, threading
+
+logger = logging.getLogger(__name__)
+
+
+class HasherPool:
+    """
+    Runs password hashing on a dedicated thread pool so it never blocks the event loop.
+    hashlib releases the GIL while hashing, so the workers run in parallel with request handling.
+    At most `max_pending` calls may be running or queued, further ones are refused with a 503.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hasher"
+        )
+        self.lock = threading.Lock()
+        self.metrics = {
+            "pending": 0,
+            "max_pending": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+
+    @property
+    def queue_depth(self):
+        # Calls waiting for a free worker
+        return max(self.metrics["pending"] - self.workers, 0)
+
+    async def run(self, func, *args):
+        with self.lock:
+            if self.metrics["pending"] >= self.max_pending:
+                self.metrics["rejected"] += 1
+                logger.warning(
+                    "Password hasher saturated, %s calls pending",
+                    self.metrics["pending"],
+                )
+                raise RequestError(
+                    err_msg="Server is busy, try again shortly", status_code=503
+                )
+            self.metrics["pending"] += 1
+            self.metrics["max_pending"] = max(
+                self.metrics["max_pending"], self.metrics["pending"]
+            )
+        outcome = "failed"
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, func, *args)
+            outcome = "completed"
+            return result
+        finally:
+            with self.lock:
+                self.metrics["pending"] -= 1
+                self.metrics[outcome] += 1
+
+
+hasher_pool = HasherPool(
+    workers=settings.PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+)
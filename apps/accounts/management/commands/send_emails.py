@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from apps.accounts.outbox import OutboxSender, queue_metrics
+import logging, threading
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Sends queued emails from the outbox with a fixed pool of workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--poll",
+            type=int,
+            default=1,
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--metrics-every", type=int, default=60, help="Seconds between metric logs"
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Send what is due and exit"
+        )
+
+    def handle(self, **options) -> None:
+        sender = OutboxSender(batch_size=options["batch_size"])
+        if options["once"]:
+            while sender.send_batch():
+                pass
+            logger.info("Email outbox metrics: %s", sender.metrics)
+            return
+
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=sender.work, args=(stop, options["poll"]), daemon=True
+            )
+            for _ in range(options["workers"])
+        ]
+        for worker in workers:
+            worker.start()
+        logger.info("Email outbox started with %s workers", len(workers))
+        try:
+            while not stop.wait(options["metrics_every"]):
+                logger.info(
+                    "Email outbox metrics: %s, queue: %s",
+                    sender.metrics,
+                    queue_metrics(),
+                )
+        except KeyboardInterrupt:
+            stop.set()
+            for worker in workers:
+                worker.join()
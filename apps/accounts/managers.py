@@ -25,7 +25,7 @@ class CustomUserManager(BaseUserManager):
             first_name=first_name, last_name=last_name, email=email, **extra_fields
         )
 
-        user.set_password(password)
+        await user.aset_password(password)
         extra_fields.setdefault("is_staff", False)
         extra_fields.setdefault("is_superuser", False)
         await user.asave(using=self._db)
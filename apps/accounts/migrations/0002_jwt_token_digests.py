@@ -0,0 +1,46 @@
+from django.db import migrations, models
+import hashlib
+
+
+def backfill_digests(apps, schema_editor):
+    Jwt = apps.get_model("accounts", "Jwt")
+    jwts = Jwt.objects.only("id", "access", "refresh")
+    batch = []
+    for jwt in jwts.iterator(chunk_size=2000):
+        jwt.access_digest = hashlib.sha256(jwt.access.encode()).hexdigest()
+        jwt.refresh_digest = hashlib.sha256(jwt.refresh.encode()).hexdigest()
+        batch.append(jwt)
+        if len(batch) == 2000:
+            Jwt.objects.bulk_update(batch, ["access_digest", "refresh_digest"])
+            batch = []
+    Jwt.objects.bulk_update(batch, ["access_digest", "refresh_digest"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jwt",
+            name="access_digest",
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="jwt",
+            name="refresh_digest",
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_digests, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="jwt",
+            name="access_digest",
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="jwt",
+            name="refresh_digest",
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
-import uuid
+import hashlib, uuid
 
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -7,6 +8,7 @@ from django.utils import timezone
 from apps.common.models import BaseModel, File
 from django.conf import settings
 from apps.common.file_processors import FileProcessor
+from .hashers import hasher_pool
 from .managers import CustomUserManager
 
 
@@ -38,19 +40,42 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    async def acheck_password(self, raw_password):
+        upgraded = []
+
+        def setter(raw_password):
+            # Rehashed on the hasher thread, saved below instead of from it
+            self.set_password(raw_password)
+            upgraded.append(True)
+
+        correct = await hasher_pool.run(
+            check_password, raw_password, self.password, setter
+        )
+        if upgraded:
+            self._password = None
+            await self.asave(update_fields=["password"])
+        return correct
+
+    async def aset_password(self, raw_password):
+        await hasher_pool.run(self.set_password, raw_password)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
     @property
-    def get_avatar(self):
+    def avatar_file(self):
+        # (key, folder, content_type) of the avatar, as FileProcessor takes them
         avatar = self.avatar
         if avatar:
-            return FileProcessor.generate_file_url(
-                key=self.avatar_id,
-                folder="avatars",
-                content_type=avatar.resource_type,
-            )
+            return (self.avatar_id, "avatars", avatar.resource_type)
+        return None
+
+    @property
+    def get_avatar(self):
+        avatar_file = self.avatar_file
+        if avatar_file:
+            return FileProcessor.generate_file_url(*avatar_file)
         return None
 
 
@@ -58,6 +83,18 @@ class Jwt(BaseModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     access = models.TextField()
     refresh = models.TextField()
+    # Fixed length, indexed stand-ins for the tokens, used for lookups
+    access_digest = models.CharField(max_length=64, unique=True, editable=False)
+    refresh_digest = models.CharField(max_length=64, unique=True, editable=False)
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.access_digest = self.digest(self.access)
+        self.refresh_digest = self.digest(self.refresh)
+        super().save(*args, **kwargs)
 
 
 class Otp(BaseModel):
@@ -70,3 +107,30 @@ class Otp(BaseModel):
         if diff.total_seconds() > int(settings.EMAIL_OTP_EXPIRE_SECONDS):
             return True
         return False
+
+
+class OutboxEmail(BaseModel):
+    STATUS_CHOICES = (
+        ("PENDING", "PENDING"),
+        ("SENT", "SENT"),
+        ("FAILED", "FAILED"),
+    )
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} - {self.to}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="outbox_status_next_idx"
+            )
+        ]
@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+from datetime import timedelta
+from .models import OutboxEmail
+import logging, threading
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxSender:
+    """
+    Sends queued OutboxEmail rows in batches over one SMTP connection per batch.
+    Batches are claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased for
+    EMAIL_OUTBOX_LEASE_SECONDS, so any number of senders can share the queue. Failed emails are retried with exponential backoff
+    until EMAIL_OUTBOX_MAX_ATTEMPTS, then marked FAILED.
+    """
+
+    def __init__(self, batch_size=50):
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.metrics = {"sent": 0, "retried": 0, "failed": 0}
+
+    def backoff(self, attempts):
+        delay = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1)
+        return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS))
+
+    def claim(self):
+        # Leased by pushing next_attempt_at past the sends, in a transaction of its
+        # own so no lock is held over SMTP. Rows of a sender that dies become due again
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(status="PENDING", next_attempt_at__lte=now)
+                .order_by("next_attempt_at")[: self.batch_size]
+            )
+            if emails:
+                OutboxEmail.objects.filter(
+                    id__in=[email.id for email in emails]
+                ).update(
+                    next_attempt_at=now
+                    + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+                )
+        return emails
+
+    def send_batch(self):
+        emails = self.claim()
+        if not emails:
+            return 0
+
+        try:
+            connection = get_connection()
+            connection.open()
+        except Exception as exc:
+            # Server unreachable, the whole batch is retried later
+            for email in emails:
+                self.record_failure(email, exc)
+            return len(emails)
+
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    to=[email.to],
+                    connection=connection,
+                )
+                message.content_subtype = "html"
+                try:
+                    message.send()
+                except Exception as exc:
+                    self.record_failure(email, exc)
+                else:
+                    email.status = "SENT"
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    email.save(update_fields=["status", "attempts", "sent_at"])
+                    self.count("sent")
+        finally:
+            connection.close()
+        return len(emails)
+
+    def record_failure(self, email, exc):
+        email.attempts += 1
+        email.last_error = str(exc)
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = "FAILED"
+            self.count("failed")
+            logger.error("Giving up on email %s to %s: %s", email.id, email.to, exc)
+        else:
+            email.status = "PENDING"
+            email.next_attempt_at = timezone.now() + self.backoff(email.attempts)
+            self.count("retried")
+        email.save(
+            update_fields=["status", "attempts", "next_attempt_at", "last_error"]
+        )
+
+    def count(self, key):
+        with self.lock:
+            self.metrics[key] += 1
+
+    def work(self, stop, poll_interval=1):
+        # Loop of one pool worker, until `stop` is set
+        while not stop.is_set():
+            try:
+                sent = self.send_batch()
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                sent = 0
+            finally:
+                close_old_connections()
+            if not sent:
+                stop.wait(poll_interval)
+
+
+def queue_metrics():
+    """Queue size per status and the age in seconds of the oldest pending email"""
+    metrics = {
+        row["status"]: row["total"]
+        for row in OutboxEmail.objects.values("status").annotate(total=Count("id"))
+    }
+    oldest = OutboxEmail.objects.filter(status="PENDING").aggregate(
+        oldest=Min("created_at")
+    )["oldest"]
+    metrics["oldest_pending_seconds"] = (
+        (timezone.now() - oldest).total_seconds() if oldest else 0
+    )
+    return metrics
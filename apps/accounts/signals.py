@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .auth import token_cache
+from .models import Jwt, User
+
+
+@receiver(post_save, sender=Jwt)
+@receiver(post_delete, sender=Jwt)
+def jwt_changed(sender, instance, **kwargs):
+    # Tokens are deleted on login and logout, and rotated on refresh
+    token_cache.evict_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    if not created:
+        token_cache.evict_user(instance.id)
@@ -1,8 +1,19 @@
+from django.contrib.auth.hashers import make_password
+from django.core import mail
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from apps.accounts.auth import Authentication
-from apps.accounts.models import Jwt, Otp
+from apps.accounts.emails import Util
+from apps.accounts.hashers import HasherPool
+from apps.accounts.models import Jwt, OutboxEmail, Otp, User
+from apps.accounts.outbox import OutboxSender
 
+from apps.common.exceptions import RequestError
+from apps.common.models import GuestUser
 from apps.common.utils import TestUtil
+from apps.listings.models import Listing, WatchList
+from asgiref.sync import async_to_sync, sync_to_async
+import asyncio, threading
 from unittest import mock
 
 
@@ -161,6 +172,42 @@ class TestAccounts(APITestCase):
             },
         )
 
+    def test_login_merges_guest_watchlists(self):
+        listing = TestUtil.create_listing(self.verified_user)["listing"]
+        other_listing = Listing.objects.create(
+            auctioneer=self.verified_user,
+            name="Other Listing",
+            desc="Other description",
+            category=listing.category,
+            price=1000.00,
+            closing_date=listing.closing_date,
+        )
+        guest = GuestUser.objects.create()
+        new_user = self.new_user
+        WatchList.objects.create(user=new_user, listing=listing)
+        WatchList.objects.create(guest=guest, listing=listing)
+        WatchList.objects.create(guest=guest, listing=other_listing)
+
+        # Test that the guest's watchlist is merged into the user's, without duplicates
+        new_user.is_email_verified = True
+        new_user.save()
+        response = self.client.post(
+            self.login_url,
+            {"email": new_user.email, "password": "testpassword"},
+            HTTP_GUESTUSERID=str(guest.id),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            set(
+                WatchList.objects.filter(user=new_user).values_list(
+                    "listing_id", flat=True
+                )
+            ),
+            {listing.id, other_listing.id},
+        )
+        self.assertFalse(GuestUser.objects.filter(id=guest.id).exists())
+        self.assertFalse(WatchList.objects.filter(guest_id=guest.id).exists())
+
     def test_refresh_token(self):
         verified_user = self.verified_user
 
@@ -204,6 +251,12 @@ class TestAccounts(APITestCase):
             },
         )
 
+        # Test that the rotated tokens are stored by digest
+        data = response.json()["data"]
+        jwt_obj.refresh_from_db()
+        self.assertEqual(jwt_obj.refresh_digest, Jwt.digest(data["refresh"]))
+        self.assertEqual(jwt_obj.access_digest, Jwt.digest(data["access"]))
+
     def test_get_password_otp(self):
         verified_user = self.verified_user
         email = verified_user.email
@@ -301,3 +354,108 @@ class TestAccounts(APITestCase):
             response.json(),
             {"status": "failure", "message": "Auth Token is Invalid or Expired!"},
         )
+
+    async def test_auth_token_cache(self):
+        auth_token = await sync_to_async(TestUtil.auth_token)(self.verified_user)
+        http_auth = f"Bearer {auth_token}"
+        user = await Authentication.decodeAuthorization(http_auth)
+        self.assertEqual(user, self.verified_user)
+
+        # Ensures a validated token is served without querying again
+        with mock.patch("apps.accounts.auth.Jwt") as jwt_model:
+            self.assertEqual(await Authentication.decodeAuthorization(http_auth), user)
+        jwt_model.objects.filter.assert_not_called()
+
+        # Ensures logging out evicts the cached token
+        response = await self.async_client.get(self.logout_url, AUTHORIZATION=http_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(await Authentication.decodeAuthorization(http_auth))
+
+    async def test_hasher_pool_saturation(self):
+        pool = HasherPool(workers=1, max_pending=1)
+        release = threading.Event()
+        blocked = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0)
+
+        # Ensures calls beyond the cap are refused instead of queued
+        with self.assertRaises(RequestError) as ctx:
+            await pool.run(str)
+        self.assertEqual(ctx.exception.status_code, 503)
+
+        release.set()
+        await blocked
+        self.assertEqual(pool.metrics["rejected"], 1)
+        self.assertEqual(pool.metrics["completed"], 1)
+        self.assertEqual(pool.metrics["pending"], 0)
+
+        # Ensures calls that raise are counted as failed, not completed
+        with self.assertRaises(ValueError):
+            await pool.run(int, "not a number")
+        self.assertEqual(pool.metrics["failed"], 1)
+        self.assertEqual(pool.metrics["completed"], 1)
+        self.assertEqual(pool.metrics["pending"], 0)
+
+    def test_password_hash_upgrade(self):
+        # Ensures an outdated hash is upgraded, and saved off the hasher threads
+        user = self.verified_user
+        user.password = make_password("testpassword", hasher="pbkdf2_sha1")
+        user.save()
+        save = User.save
+        saved_on = []
+
+        def recorded_save(user, *args, **kwargs):
+            saved_on.append(threading.current_thread().name)
+            return save(user, *args, **kwargs)
+
+        with mock.patch.object(User, "save", recorded_save):
+            self.assertTrue(async_to_sync(user.acheck_password)("testpassword"))
+        self.assertEqual(len(saved_on), 1)
+        self.assertFalse(saved_on[0].startswith("hasher"))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(user.check_password("testpassword"))
+
+    def test_email_outbox(self):
+        # Test that emails are queued and sent in a batch over one connection
+        async_to_sync(Util.welcome_email)(self.verified_user)
+        async_to_sync(Util.password_reset_confirmation)(self.verified_user)
+        sender = OutboxSender()
+        self.assertEqual(sender.send_batch(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboxEmail.objects.filter(status="SENT").count(), 2)
+        self.assertEqual(sender.send_batch(), 0)
+
+        # Test that a batch is leased while sent, hidden from the other senders
+        async_to_sync(Util.welcome_email)(self.verified_user)
+        claimed_during_send = []
+
+        def send(message):
+            claimed_during_send.extend(OutboxSender().claim())
+            email = OutboxEmail.objects.get(status="PENDING")
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            return 1
+
+        with mock.patch("apps.accounts.outbox.EmailMessage.send", send):
+            self.assertEqual(sender.send_batch(), 1)
+        self.assertEqual(claimed_during_send, [])
+        self.assertEqual(OutboxEmail.objects.filter(status="SENT").count(), 3)
+
+        # Test that failed emails are retried later, then given up on
+        async_to_sync(Util.welcome_email)(self.verified_user)
+        with mock.patch(
+            "apps.accounts.outbox.EmailMessage.send", side_effect=OSError("refused")
+        ):
+            self.assertEqual(sender.send_batch(), 1)
+            email = OutboxEmail.objects.get(status="PENDING")
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.last_error, "refused")
+            self.assertEqual(sender.send_batch(), 0)
+
+            with self.settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2):
+                OutboxEmail.objects.filter(id=email.id).update(
+                    next_attempt_at=timezone.now()
+                )
+                sender.send_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "FAILED")
+        self.assertEqual(sender.metrics, {"sent": 3, "retried": 1, "failed": 1})
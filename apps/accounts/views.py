@@ -1,12 +1,9 @@
-from adrf.views import APIView
-
 from apps.common.utils import IsAuthenticatedCustom, is_uuid
 from .auth import Authentication
 from .emails import Util
 
 from .models import Jwt, Otp, User
-from apps.common.models import GuestUser
-from apps.listings.models import WatchList
+from apps.listings.services import amerge_guest_watchlists
 from .serializers import (
     LoginSerializer,
     RefreshSerializer,
@@ -17,9 +14,9 @@ from .serializers import (
 )
 from drf_spectacular.utils import extend_schema
 from apps.common.responses import CustomResponse
+from apps.common.views import APIView
 
 from apps.common.exceptions import RequestError
-from asgiref.sync import sync_to_async
 
 
 class RegisterView(APIView):
@@ -88,7 +85,7 @@ class VerifyEmailView(APIView):
         await otp.adelete()
 
         # Send welcome email
-        Util.welcome_email(user)
+        await Util.welcome_email(user)
         return CustomResponse.success(
             message="Account verification successful", status_code=200
         )
@@ -166,11 +163,11 @@ class SetNewPasswordView(APIView):
         if otp.check_expiration():
             raise RequestError(err_msg="Expired Otp")
 
-        user.set_password(password)
+        await user.aset_password(password)
         await user.asave()
 
         # Send password reset success email
-        Util.password_reset_confirmation(user)
+        await Util.password_reset_confirmation(user)
         return CustomResponse.success(message="Password reset successful")
 
 
@@ -190,7 +187,7 @@ class LoginView(APIView):
         password = data["password"]
 
         user = await User.objects.get_or_none(email=email)
-        if not user or not user.check_password(password):
+        if not user or not await user.acheck_password(password):
             raise RequestError(err_msg="Invalid credentials", status_code=401)
 
         if not user.is_email_verified:
@@ -205,23 +202,7 @@ class LoginView(APIView):
         # Move all guest user watchlists to the authenticated user watchlists
         guest_id = is_uuid(request.headers.get("Guestuserid"))
         if guest_id:
-            guest_user_watchlists_ids = await sync_to_async(list)(
-                WatchList.objects.filter(guest_id=guest_id)
-                .exclude(
-                    listing_id__in=WatchList.objects.filter(user=user)
-                    .select_related("user", "guest")
-                    .values_list("listing_id", flat=True)
-                )
-                .select_related("user", "listing")
-                .values_list("listing_id", flat=True)
-            )
-            if len(guest_user_watchlists_ids) > 0:
-                data_to_create = [
-                    WatchList(user_id=user.id, listing_id=listing_id)
-                    for listing_id in guest_user_watchlists_ids
-                ]
-                await WatchList.objects.abulk_create(data_to_create)
-                await GuestUser.objects.filter(id=guest_id).adelete()
+            await amerge_guest_watchlists(user.id, guest_id)
 
         return CustomResponse.success(
             message="Login successful",
@@ -243,7 +224,7 @@ class RefreshTokensView(APIView):
         data = serializer.validated_data
 
         token = data["refresh"]
-        jwt = await Jwt.objects.get_or_none(refresh=token)
+        jwt = await Jwt.objects.get_or_none(refresh_digest=Jwt.digest(token))
 
         if not jwt:
             raise RequestError(err_msg="Refresh token does not exist", status_code=404)
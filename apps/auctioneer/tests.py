@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APITestCase
 from apps.accounts.auth import Authentication
@@ -69,6 +71,19 @@ class TestAuctioneer(APITestCase):
         self.assertGreater(len(data), 0)
         self.assertTrue(any(isinstance(obj["name"], str) for obj in data))
 
+        # Verify that the quantity is applied as a LIMIT in SQL
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                self.listings_url, {"quantity": 1}, **self.bearer
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            any(
+                'FROM "listings_listing"' in query["sql"] and "LIMIT 1" in query["sql"]
+                for query in ctx.captured_queries
+            )
+        )
+
     def test_auctioneer_create_listings(self):
         # Create Category
         Category.objects.create(name="Test Category")
@@ -202,6 +217,23 @@ class TestAuctioneer(APITestCase):
         data = result["data"]
         self.assertTrue(isinstance(data["listing"], str))
 
+        # Verify that bids are paginated, highest first
+        Bid.objects.create(user=TestUtil.new_user(), listing=listing, amount=6000.00)
+        response = self.client.get(
+            f"{self.listings_url}{listing.slug}/bids/?limit=1", **self.bearer
+        )
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual([bid["amount"] for bid in result["data"]["bids"]], ["6000.00"])
+        self.assertIsNone(result["pagination"]["previous"])
+        response = self.client.get(
+            f"{self.listings_url}{listing.slug}/bids/?limit=1&cursor={result['pagination']['next']}",
+            **self.bearer,
+        )
+        result = response.json()
+        self.assertEqual([bid["amount"] for bid in result["data"]["bids"]], ["5000.00"])
+        self.assertIsNone(result["pagination"]["next"])
+
         # Verify that the auctioneer listing bids retrieval failed with invalid listing slug
         response = self.client.get(
             f"{self.listings_url}invalid_slug/bids/", **self.bearer
@@ -1,20 +1,20 @@
-from django.db.models import Prefetch, Q
-from adrf.views import APIView
 from apps.common.exceptions import RequestError
 from apps.common.models import File
+from apps.common.paginators import CursorPaginator
 from apps.common.responses import CustomResponse
+from apps.common.views import APIView
 from apps.common.utils import (
     IsAuthenticatedCustom,
     is_int,
 )
-from apps.listings.models import Category, Listing, WatchList
+from apps.listings.categories import category_registry
+from apps.listings.models import Bid, Listing
 from apps.listings.serializers import BidSerializer, ListingSerializer
 from .serializers import (
     ListingCreateResponseSerializer,
     ProfileSerializer,
 )
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from asgiref.sync import sync_to_async
 
 
 class ProfileView(APIView):
@@ -79,29 +79,19 @@ class AuctioneerListingsView(APIView):
     )
     async def get(self, request):
         client = request.user
-        listings = await sync_to_async(list)(
+        quantity = is_int(request.GET.get("quantity"))
+        listings = (
             Listing.objects.filter(auctioneer=client)
+            .with_watch_status(client)
             .select_related("auctioneer", "auctioneer__avatar", "category", "image")
-            .prefetch_related(
-                Prefetch(
-                    "watchlists",
-                    queryset=WatchList.objects.filter(
-                        Q(user_id=client.id if client else None)
-                        | Q(guest_id=client.id if client else None)
-                    ),
-                    to_attr="watchlist",
-                )
-            )
+            .limit(quantity)
         )
-        quantity = is_int(request.GET.get("quantity"))
-        if quantity:
-            # Retrieve based on amount
-            listings = listings[:quantity]
-        serializer = self.serializer_class(
-            listings, many=True, context={"client": client}
-        )
-        return CustomResponse.success(
-            message="Auctioneer Listings fetched", data=serializer.data
+        return await CustomResponse.astream(
+            request,
+            message="Auctioneer Listings fetched",
+            queryset=listings,
+            serializer_class=self.serializer_class,
+            context={"client": client},
         )
 
     @extend_schema(
@@ -117,7 +107,7 @@ class AuctioneerListingsView(APIView):
         category = data["category"]
 
         if not category == "other":
-            category = await Category.objects.get_or_none(slug=category)
+            category = await category_registry.aget(category)
             if not category:
                 # Return a data validation error
                 raise RequestError(
@@ -177,7 +167,7 @@ class UpdateListingView(APIView):
 
         if category:
             if not category == "other":
-                category = await Category.objects.get_or_none(slug=category)
+                category = await category_registry.aget(category)
                 if not category:
                     # Return a data validation error
                     raise RequestError(
@@ -213,20 +203,32 @@ class UpdateListingView(APIView):
 class AuctioneerListingBids(APIView):
     serializer_class = BidSerializer
     permission_classes = (IsAuthenticatedCustom,)
+    # Amounts are unique per listing, so they alone give a stable keyset
+    paginator = CursorPaginator(ordering=("-amount",))
 
     @extend_schema(
         summary="Retrieve all bids in a listing (current user)",
-        description="This endpoint retrieves all bids in a particular listing by the current user.",
+        description="This endpoint retrieves all bids in a particular listing by the current user, highest first, a page at a time.",
+        parameters=[
+            OpenApiParameter(
+                name="cursor",
+                description="Cursor from a previous page's pagination data",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Page size",
+                required=False,
+                type=int,
+            ),
+        ],
     )
     async def get(self, request, *args, **kwargs):
         user = request.user
         # Get listing by slug
-        listing = (
-            await Listing.objects.select_related(
-                "auctioneer", "auctioneer__avatar", "category", "image"
-            )
-            .prefetch_related("bids", "bids__user")
-            .get_or_none(slug=kwargs.get("slug"))
+        listing = await Listing.objects.only("id", "name", "auctioneer_id").get_or_none(
+            slug=kwargs.get("slug")
         )
         if not listing:
             raise RequestError(err_msg="Listing does not exist!", status_code=404)
@@ -235,8 +237,16 @@ class AuctioneerListingBids(APIView):
         if user.id != listing.auctioneer_id:
             raise RequestError(err_msg="This listing doesn't belong to you!")
 
-        bids = listing.bids.all()
+        bids, pagination = await self.paginator.paginate(
+            Bid.objects.filter(listing_id=listing.id).select_related(
+                "user", "user__avatar"
+            ),
+            cursor=request.GET.get("cursor"),
+            limit=request.GET.get("limit"),
+        )
         serializer = self.serializer_class({"listing": listing.name, "bids": bids})
         return CustomResponse.success(
-            message="Listing Bids fetched", data=serializer.data
+            message="Listing Bids fetched",
+            data=serializer.data,
+            pagination=pagination,
         )
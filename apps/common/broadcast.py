@@ -0,0 +1,107 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from asgiref.sync import sync_to_async
+import json, logging, threading, time
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroadcast:
+    """In-process pub/sub. Subscribers are callbacks taking the published message"""
+
+    def __init__(self):
+        self.subscribers = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def subscribe(self, channel, callback):
+        with self.lock:
+            self.subscribers[channel].append(callback)
+
+    def unsubscribe(self, channel, callback):
+        with self.lock:
+            if callback in self.subscribers[channel]:
+                self.subscribers[channel].remove(callback)
+
+    def deliver(self, channel, message):
+        with self.lock:
+            callbacks = list(self.subscribers[channel])
+        for callback in callbacks:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Broadcast subscriber failed on '%s'", channel)
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    async def apublish(self, channel, message):
+        self.publish(channel, message)
+
+
+class PostgresBroadcast(LocalBroadcast):
+    """
+    Shared bus over postgres LISTEN/NOTIFY, so messages reach every worker process.
+    Each process keeps one listening connection in a daemon thread and delivers
+    notifications to its local subscribers. Messages are JSON and must stay under 8KB.
+    """
+
+    pg_channel = "bidout_broadcast"
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def subscribe(self, channel, callback):
+        super().subscribe(channel, callback)
+        self.start()
+
+    def publish(self, channel, message):
+        payload = json.dumps(
+            {"channel": channel, "message": message}, cls=DjangoJSONEncoder
+        )
+        # Sent on commit when called within a transaction
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.pg_channel, payload])
+
+    async def apublish(self, channel, message):
+        await sync_to_async(self.publish)(channel, message)
+
+    def start(self):
+        with self.lock:
+            if self.listener and self.listener.is_alive():
+                return
+            self.listener = threading.Thread(target=self.listen, daemon=True)
+            self.listener.start()
+
+    def listen(self):
+        import psycopg
+
+        db = settings.DATABASES["default"]
+        while True:
+            try:
+                with psycopg.connect(
+                    dbname=db["NAME"],
+                    user=db["USER"],
+                    password=db["PASSWORD"],
+                    host=db["HOST"],
+                    port=db["PORT"],
+                    autocommit=True,
+                ) as conn:
+                    conn.execute(f"LISTEN {self.pg_channel}")
+                    for notify in conn.notifies():
+                        data = json.loads(notify.payload)
+                        self.deliver(data["channel"], data["message"])
+            except Exception:
+                logger.exception("Broadcast listener disconnected, reconnecting")
+                time.sleep(1)
+
+
+def get_broadcast():
+    if settings.BROADCAST_BACKEND == "postgres":
+        return PostgresBroadcast()
+    return LocalBroadcast()
+
+
+broadcast = get_broadcast()
@@ -1,51 +1,93 @@
 from django.conf import settings
-import time
-import cloudinary
-import cloudinary.uploader
-import mimetypes
+from .cache import LRUCache
+from .file_types import ALLOWED_IMAGE_TYPES
+from .storage import get_storage
+import logging, mimetypes
+
+logger = logging.getLogger(__name__)
 
 BASE_FOLDER = "bidout-auction-v4/"
 
-# FILES CONFIG WITH CLOUDINARY
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-)
+# Extensions of the allowed image types, others are looked up when first seen
+FILE_EXTENSIONS = {
+    content_type: mimetypes.guess_extension(content_type)
+    for content_type in ALLOWED_IMAGE_TYPES
+}
+
+# Built file urls, keyed by (key, folder, content_type)
+file_url_cache = LRUCache(maxsize=settings.FILE_URL_CACHE_SIZE)
+
+# Where files live, selected by FILE_STORAGE_BACKEND
+storage = get_storage()
 
 
 class FileProcessor:
     @staticmethod
     def generate_file_signature(key, folder):
         key = f"{BASE_FOLDER}{folder}/{key}"
-        timestamp = str(int(time.time()))
-        params = {
-            "public_id": key,
-            "timestamp": timestamp,
-        }
         try:
-            signature = cloudinary.utils.api_sign_request(
-                params_to_sign=params, api_secret=settings.CLOUDINARY_API_SECRET
-            )
-            return {"public_id": key, "signature": signature, "timestamp": timestamp}
-        except Exception as e:
-            print(e)
-            pass
+            return storage.sign(key)
+        except Exception:
+            logger.exception("Could not sign upload of %s", key)
 
-    def generate_file_url(key, folder, content_type):
-        file_extension = mimetypes.guess_extension(content_type)
+    async def agenerate_file_signature(key, folder):
+        # Signing is local computation, nothing to wait on
+        return FileProcessor.generate_file_signature(key, folder)
+
+    def build_file_url(key, folder, content_type):
+        if content_type in FILE_EXTENSIONS:
+            file_extension = FILE_EXTENSIONS[content_type]
+        else:
+            file_extension = mimetypes.guess_extension(content_type)
         key = f"{BASE_FOLDER}{folder}/{key}{file_extension}"
 
         try:
-            return cloudinary.utils.cloudinary_url(key, secure=True)[0]
-        except Exception as e:
-            print(e)
-            pass
+            return storage.url(key)
+        except Exception:
+            logger.exception("Could not build url of %s", key)
+
+    def generate_file_url(key, folder, content_type):
+        return FileProcessor.generate_file_urls([(key, folder, content_type)]).get(
+            (str(key), folder, content_type)
+        )
+
+    def generate_file_urls(files):
+        """
+        Resolves (key, folder, content_type) triples to urls, e.g for a whole page of listings.
+        Returns a dict keyed by the triples, with keys as strings.
+        """
+        files = {
+            (str(key), folder, content_type) for key, folder, content_type in files
+        }
+        urls = file_url_cache.get_many(files)
+        built = {}
+        for file in files - urls.keys():
+            url = FileProcessor.build_file_url(*file)
+            if url:
+                built[file] = url
+        if built:
+            file_url_cache.set_many(built)
+        return {**urls, **built}
+
+    async def agenerate_file_urls(files):
+        # Urls are built locally and memoized, nothing to wait on
+        return FileProcessor.generate_file_urls(files)
 
     def upload_file(file, key, folder):
+        # Returns whether the file was uploaded, failures are logged
+        key = f"{BASE_FOLDER}{folder}/{key}"
+        try:
+            storage.upload(file, key)
+        except Exception:
+            logger.exception("Could not upload %s", key)
+            return False
+        return True
+
+    async def aupload_file(file, key, folder):
         key = f"{BASE_FOLDER}{folder}/{key}"
         try:
-            cloudinary.uploader.upload(file, public_id=key, overwrite=True, faces=True)
-        except Exception as e:
-            print(e)
-            pass
+            await storage.aupload(file, key)
+        except Exception:
+            logger.exception("Could not upload %s", key)
+            return False
+        return True
@@ -0,0 +1,110 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from apps.accounts.models import User
+from apps.common.models import File
+from apps.common.renderers import ORJSONRenderer
+from apps.listings.models import Category, Listing
+from apps.listings.serializers import ListingSerializer
+from datetime import timedelta
+from decimal import Decimal
+import logging, time, uuid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares render times of JSONRenderer and ORJSONRenderer on listings payloads. "
+        "Listings are built in memory, nothing is read from or written to the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=1000)
+        parser.add_argument("--rounds", type=int, default=100)
+
+    def handle(self, **options) -> None:
+        listings = self.build_listings(options["listings"])
+        payloads = {
+            # What the listings endpoints render, fields already made strings
+            "serialized": ListingSerializer(
+                listings, many=True, context={"client": None}
+            ).data,
+            # Model values, with UUIDs, datetimes and Decimals left to the renderer
+            "values": [
+                {
+                    "id": listing.id,
+                    "auctioneer_id": listing.auctioneer.id,
+                    "name": listing.name,
+                    "price": listing.price,
+                    "highest_bid": listing.highest_bid,
+                    "bids_count": listing.bids_count,
+                    "closing_date": listing.closing_date,
+                    "created_at": listing.created_at,
+                }
+                for listing in listings
+            ],
+        }
+        for name, data in payloads.items():
+            envelope = {
+                "status": "success",
+                "message": "Listings fetched",
+                "data": data,
+            }
+            json_seconds, json_output = self.time_render(
+                JSONRenderer(), envelope, options["rounds"]
+            )
+            orjson_seconds, orjson_output = self.time_render(
+                ORJSONRenderer(), envelope, options["rounds"]
+            )
+            logger.info(
+                "%s payload of %s listings (%s bytes): JSONRenderer %.2fms, "
+                "ORJSONRenderer %.2fms, %.1fx faster, identical output: %s",
+                name,
+                len(listings),
+                len(json_output),
+                json_seconds * 1000,
+                orjson_seconds * 1000,
+                json_seconds / orjson_seconds,
+                json_output == orjson_output,
+            )
+
+    def build_listings(self, count):
+        now = timezone.now()
+        category = Category(id=uuid.uuid4(), name="Benchmark")
+        listings = []
+        for idx in range(count):
+            auctioneer = User(
+                id=uuid.uuid4(),
+                first_name="Bench",
+                last_name=f"Mark {idx}",
+                avatar=File(id=uuid.uuid4(), resource_type="image/png"),
+            )
+            listing = Listing(
+                id=uuid.uuid4(),
+                auctioneer=auctioneer,
+                name=f"Benchmark listing {idx}",
+                slug=f"benchmark-listing-{idx}",
+                desc="A listing built for the renderers benchmark. " * 4,
+                category=category,
+                price=Decimal(1000 + idx) / 100,
+                highest_bid=Decimal(2000 + idx) / 100,
+                bids_count=idx % 50,
+                closing_date=now + timedelta(hours=idx),
+                image=File(id=uuid.uuid4(), resource_type="image/jpeg"),
+                created_at=now,
+                updated_at=now,
+            )
+            listing.watchlist = False
+            listings.append(listing)
+        return listings
+
+    def time_render(self, renderer, data, rounds):
+        # Best of the rounds, the least disturbed by the rest of the machine
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            output = renderer.render(data, "application/json")
+            best = min(best, time.perf_counter() - started)
+        return best, output
@@ -2,25 +2,33 @@ from django.conf import settings
 from django.utils import timezone
 from apps.accounts.models import User
 from apps.general.models import SiteDetail, Review
+from apps.listings.categories import recount_active_listings_counts
 from apps.listings.models import Category, Listing
 from apps.common.models import File
 from apps.common.file_processors import FileProcessor
 
 from pathlib import Path
-from .mappings import listing_mappings, category_mappings, file_mappings
+from .mappings import (
+    listing_mappings,
+    category_mappings,
+    file_mappings,
+    listing_images,
+)
 from datetime import timedelta
 from typing import List
 from uuid import UUID
 from asgiref.sync import sync_to_async
-import os, random
+import asyncio, logging, os, random, time
+
+logger = logging.getLogger(__name__)
 
 CURRENT_DIR = Path(__file__).resolve().parent
 test_images_directory = os.path.join(CURRENT_DIR, "images")
 
 
 class CreateData(object):
-    def __init__(self) -> None:
-        pass
+    def __init__(self, upload_concurrency=6) -> None:
+        self.upload_concurrency = upload_concurrency
 
     async def initialize(self) -> None:
         await self.create_superuser()
@@ -136,9 +144,43 @@ class CreateData(object):
                 Listing(**listing) for listing in updated_listing_mappings
             ]
             await Listing.objects.abulk_create(listings_to_create)
+            # bulk_create skips the signals that keep the counts
+            await sync_to_async(recount_active_listings_counts)()
 
             # Upload Images
-            for idx, image_file in enumerate(os.listdir(test_images_directory)):
-                image_path = os.path.join(test_images_directory, image_file)
-                FileProcessor.upload_file(image_path, str(files[idx].id), "listings")
-        pass
+            await self.upload_images(
+                [
+                    (os.path.join(test_images_directory, image), str(file.id))
+                    for image, file in zip(listing_images, files)
+                ]
+            )
+
+    async def upload_images(self, uploads) -> int:
+        # Uploads (path, key) pairs, at most `upload_concurrency` at a time.
+        # Returns how many were uploaded
+        semaphore = asyncio.Semaphore(self.upload_concurrency)
+        done = uploaded = uploaded_bytes = 0
+        started = time.monotonic()
+
+        async def upload(path, key):
+            nonlocal done, uploaded, uploaded_bytes
+            async with semaphore:
+                success = await FileProcessor.aupload_file(path, key, "listings")
+            done += 1
+            if success:
+                uploaded += 1
+                uploaded_bytes += os.path.getsize(path)
+            logger.info("Processed %s/%s images", done, len(uploads))
+
+        await asyncio.gather(*(upload(path, key) for path, key in uploads))
+        elapsed = max(time.monotonic() - started, 1e-6)
+        logger.info(
+            "Uploaded %s images (%.1f MB) in %.2fs, %.1f images/s",
+            uploaded,
+            uploaded_bytes / 1e6,
+            elapsed,
+            uploaded / elapsed,
+        )
+        if uploaded < len(uploads):
+            logger.error("Failed to upload %s images", len(uploads) - uploaded)
+        return uploaded
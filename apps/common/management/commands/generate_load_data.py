@@ -0,0 +1,366 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from django.utils.text import slugify
+from apps.accounts.models import User
+from apps.listings.models import Bid, Category, Listing, WatchList
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+import logging, random, time, uuid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CopyWriter:
+    """Buffers rows for a table and writes them with COPY, one statement per batch"""
+
+    def __init__(self, model, columns, batch_size):
+        columns = ", ".join(connection.ops.quote_name(column) for column in columns)
+        self.sql = f"COPY {model._meta.db_table} ({columns}) FROM STDIN"
+        self.table = model._meta.db_table
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+        self.started = time.monotonic()
+
+    @staticmethod
+    def format(value):
+        if value is None:
+            return "\\N"
+        if value is True or value is False:
+            return "t" if value else "f"
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return str(value)
+
+    def add(self, *values):
+        self.rows.append("\t".join(map(self.format, values)))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        with connection.cursor() as cursor:
+            with cursor.copy(self.sql) as copy:
+                copy.write("\n".join(self.rows) + "\n")
+        self.written += len(self.rows)
+        self.rows = []
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        logger.info(
+            "%s: %s rows, %.0f rows/s", self.table, self.written, self.written / elapsed
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users, categories, listings, bids and watchlists for load testing. "
+        "Rows are derived from --seed, so each seed can be generated once per database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--listings", type=int, default=100000)
+        parser.add_argument("--bids", type=int, default=1000000)
+        parser.add_argument("--watchlists", type=int, default=200000)
+        parser.add_argument(
+            "--zipf", type=float, default=1.1, help="Skew of bids across listings"
+        )
+        parser.add_argument(
+            "--hot-fraction",
+            type=float,
+            default=0.02,
+            help="Share of listings closing within the hour, which get the most bids",
+        )
+        parser.add_argument(
+            "--closed-fraction",
+            type=float,
+            default=0.2,
+            help="Share of listings already closed",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=200000)
+
+    def handle(self, **options) -> None:
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.seed = options["seed"]
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        users = self.create_users(options["users"])
+        categories = self.create_categories(options["categories"])
+        listings = self.create_listings(
+            options["listings"],
+            users,
+            categories,
+            total_bids=options["bids"],
+            zipf=options["zipf"],
+            hot_fraction=options["hot_fraction"],
+            closed_fraction=options["closed_fraction"],
+        )
+        self.create_bids(listings, users)
+        self.create_watchlists(options["watchlists"], listings, users)
+        self.finish()
+        logger.info("Load data generated in %.1fs", time.monotonic() - started)
+
+    def new_id(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def past(self, max_days):
+        return self.now - timedelta(seconds=self.rng.uniform(0, max_days * 86400))
+
+    def create_users(self, count):
+        # One shared hash, hashing every user separately would take hours
+        password = make_password("loadtestpassword")
+        writer = CopyWriter(
+            User,
+            [
+                "id",
+                "password",
+                "first_name",
+                "last_name",
+                "email",
+                "terms_agreement",
+                "is_email_verified",
+                "is_staff",
+                "is_active",
+                "is_superuser",
+                "created_at",
+                "updated_at",
+            ],
+            self.batch_size,
+        )
+        users = []
+        for idx in range(count):
+            user_id = self.new_id()
+            created_at = self.past(365)
+            writer.add(
+                user_id,
+                password,
+                "Load",
+                f"User{idx}",
+                f"load{self.seed}-user{idx}@example.com",
+                True,
+                True,
+                False,
+                True,
+                False,
+                created_at,
+                created_at,
+            )
+            users.append(user_id)
+        writer.flush()
+        return users
+
+    def create_categories(self, count):
+        # Active listings counts are filled in by finish()
+        writer = CopyWriter(
+            Category,
+            ["id", "name", "slug", "active_listings_count", "created_at", "updated_at"],
+            self.batch_size,
+        )
+        categories = []
+        for idx in range(count):
+            category_id = self.new_id()
+            name = f"Load{self.seed} {idx}"
+            writer.add(category_id, name, slugify(name), 0, self.now, self.now)
+            categories.append(category_id)
+        writer.flush()
+        return categories
+
+    def create_listings(
+        self,
+        count,
+        users,
+        categories,
+        total_bids,
+        zipf,
+        hot_fraction,
+        closed_fraction,
+    ):
+        # Bids per listing follow a zipf law over a random ranking of the listings,
+        # hot listings (closing within the hour) take the top ranks
+        weights = [1 / (rank**zipf) for rank in range(1, count + 1)]
+        max_bids = max(len(users) - 1, 0)
+        scale = self.bids_scale(weights, total_bids, max_bids)
+        hot_count = int(count * hot_fraction)
+        # Applied to the other listings, so the overall share matches
+        closed_chance = closed_fraction * count / max(count - hot_count, 1)
+
+        writer = CopyWriter(
+            Listing,
+            [
+                "id",
+                "auctioneer_id",
+                "name",
+                "slug",
+                "desc",
+                "category_id",
+                "price",
+                "highest_bid",
+                "bids_count",
+                "closing_date",
+                "active",
+                "created_at",
+                "updated_at",
+            ],
+            self.batch_size,
+        )
+        listings = []
+        # Rounded cumulatively, so the counts add up to the total
+        expected, assigned = 0, 0
+        for rank in range(count):
+            listing_id = self.new_id()
+            auctioneer_idx = self.rng.randrange(len(users))
+            category_id = self.rng.choice(categories) if categories else None
+            price = Decimal(self.rng.randint(1000, 1000000)) / 100
+            increment = Decimal(self.rng.randint(100, 5000)) / 100
+            expected += min(weights[rank] * scale, max_bids)
+            bids_count = round(expected) - assigned
+            assigned += bids_count
+            highest_bid = price + increment * bids_count if bids_count else 0
+            created_at = self.past(30)
+            if rank < hot_count:
+                closing_date = self.now + timedelta(seconds=self.rng.uniform(60, 3600))
+                active = True
+            elif self.rng.random() < closed_chance:
+                closing_date = self.now - timedelta(seconds=self.rng.uniform(60, 86400))
+                active = False
+            else:
+                closing_date = self.now + timedelta(days=self.rng.uniform(1, 30))
+                active = True
+
+            name = f"Load listing {rank}"
+            writer.add(
+                listing_id,
+                users[auctioneer_idx],
+                name,
+                f"{slugify(name)}-{self.seed}",
+                "Generated for load testing.",
+                category_id,
+                price,
+                highest_bid,
+                bids_count,
+                closing_date,
+                active,
+                created_at,
+                created_at,
+            )
+            listings.append(
+                (listing_id, auctioneer_idx, price, increment, bids_count, created_at)
+            )
+
+        writer.flush()
+        return listings
+
+    @staticmethod
+    def bids_scale(weights, total_bids, max_bids):
+        # A listing can't take more bids than there are other users, so the excess
+        # of capped listings is spread over the rest by searching for the scale
+        low, high = 0, total_bids / weights[-1] if weights else 0
+        for _ in range(40):
+            scale = (low + high) / 2
+            if sum(min(weight * scale, max_bids) for weight in weights) < total_bids:
+                low = scale
+            else:
+                high = scale
+        return high
+
+    def create_bids(self, listings, users):
+        writer = CopyWriter(
+            Bid,
+            ["id", "user_id", "listing_id", "amount", "created_at", "updated_at"],
+            self.batch_size,
+        )
+        user_indexes = range(len(users))
+        for (
+            listing_id,
+            auctioneer_idx,
+            price,
+            increment,
+            bids_count,
+            created_at,
+        ) in listings:
+            if not bids_count:
+                continue
+            # Distinct bidders other than the auctioneer, each outbidding the last
+            bidders = [
+                idx
+                for idx in self.rng.sample(user_indexes, bids_count + 1)
+                if idx != auctioneer_idx
+            ][:bids_count]
+            span = (self.now - created_at).total_seconds()
+            bid_times = sorted(
+                created_at + timedelta(seconds=self.rng.uniform(0, span))
+                for _ in bidders
+            )
+            for position, (bidder_idx, bid_time) in enumerate(zip(bidders, bid_times)):
+                writer.add(
+                    self.new_id(),
+                    users[bidder_idx],
+                    listing_id,
+                    price + increment * (position + 1),
+                    bid_time,
+                    bid_time,
+                )
+        writer.flush()
+
+    def create_watchlists(self, count, listings, users):
+        # Popular (high bid) listings are watched the most
+        cum_weights = list(accumulate(listing[4] + 1 for listing in listings))
+        writer = CopyWriter(
+            WatchList,
+            ["id", "user_id", "listing_id", "created_at", "updated_at"],
+            self.batch_size,
+        )
+        seen = set()
+        for _ in range(count):
+            user_idx = self.rng.randrange(len(users))
+            listing_idx = self.rng.choices(
+                range(len(listings)), cum_weights=cum_weights
+            )[0]
+            if (user_idx, listing_idx) in seen:
+                continue
+            seen.add((user_idx, listing_idx))
+            created_at = self.past(30)
+            writer.add(
+                self.new_id(),
+                users[user_idx],
+                listings[listing_idx][0],
+                created_at,
+                created_at,
+            )
+        writer.flush()
+
+    def finish(self):
+        listings_table = Listing._meta.db_table
+        bids_table = Bid._meta.db_table
+        categories_table = Category._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {categories_table} AS category SET active_listings_count = (
+                    SELECT COUNT(*) FROM {listings_table} AS listing
+                    WHERE listing.category_id = category.id AND listing.active
+                )
+                """
+            )
+            # Closed listings are won by their highest bid
+            cursor.execute(
+                f"""
+                UPDATE {listings_table} AS listing SET winning_bid_id = (
+                    SELECT bid.id FROM {bids_table} AS bid
+                    WHERE bid.listing_id = listing.id
+                    ORDER BY bid.amount DESC LIMIT 1
+                )
+                WHERE NOT listing.active AND listing.bids_count > 0
+                  AND listing.winning_bid_id IS NULL
+                """
+            )
+            for model in (User, Category, Listing, Bid, WatchList):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
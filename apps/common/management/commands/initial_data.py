@@ -6,13 +6,21 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def init() -> None:
-    create_data = CreateData()
+async def init(upload_concurrency) -> None:
+    create_data = CreateData(upload_concurrency=upload_concurrency)
     await create_data.initialize()
 
 
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--upload-concurrency",
+            type=int,
+            default=6,
+            help="Images uploaded at the same time",
+        )
+
     def handle(self, **options) -> None:
         logger.info("Creating initial data")
-        asyncio.run(init())
+        asyncio.run(init(options["upload_concurrency"]))
         logger.info("Initial data created")
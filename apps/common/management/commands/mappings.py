@@ -16,4 +16,14 @@ category_mappings = [
     {"name": "Fashion", "slug": "fashion"},
 ]
 
-file_mappings = [{"resource_type": "image/png"} for i in range(6)]
+# images in images/, one per listing in listing_mappings order
+listing_images = [
+    "live-auc1.png",
+    "live-auc2.png",
+    "live-auc3.png",
+    "live-auc4.png",
+    "live-auc5.png",
+    "live-auc6.png",
+]
+
+file_mappings = [{"resource_type": "image/png"} for image in listing_images]
@@ -2,7 +2,7 @@ from django.db import models
 
 
 class GetOrNoneQuerySet(models.QuerySet):
-    """Custom QuerySet that supports get_or_none()"""
+    """Custom QuerySet that supports get_or_none() and limit()"""
 
     async def get_or_none(self, **kwargs):
         try:
@@ -10,6 +10,12 @@ class GetOrNoneQuerySet(models.QuerySet):
         except self.model.DoesNotExist:
             return None
 
+    def limit(self, quantity):
+        # Applies the quantity as a LIMIT in SQL. Also works within Prefetch querysets.
+        if not quantity:
+            return self
+        return self[:quantity]
+
 
 class GetOrNoneManager(models.Manager):
     """Adds get_or_none method to objects"""
@@ -19,3 +25,6 @@ class GetOrNoneManager(models.Manager):
 
     async def get_or_none(self, **kwargs):
         return await self.get_queryset().get_or_none(**kwargs)
+
+    def limit(self, quantity):
+        return self.get_queryset().limit(quantity)
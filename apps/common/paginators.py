@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from asgiref.sync import sync_to_async
+from apps.common.exceptions import RequestError
+import base64, json
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over a fixed ordering.
+    The ordering must end with a unique field so every row has a distinct position.
+    Cursors are opaque base64 strings holding the position of a boundary row
+    and the ordering it was taken in, so they can't be reused with another one.
+    """
+
+    def __init__(self, ordering, page_size=None, max_page_size=100):
+        self.ordering = ordering
+        self.page_size = page_size or settings.REST_FRAMEWORK["PAGE_SIZE"]
+        self.max_page_size = max_page_size
+
+    def encode_cursor(self, obj, reverse=False):
+        position = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip("-"))
+            position.append(
+                value.isoformat() if hasattr(value, "isoformat") else str(value)
+            )
+        payload = json.dumps(
+            {"o": ",".join(self.ordering), "p": position, "r": reverse},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            ordering, position, reverse = payload["o"], payload["p"], bool(payload["r"])
+        except:
+            raise RequestError(err_msg="Invalid cursor", status_code=422)
+        if (
+            ordering != ",".join(self.ordering)
+            or not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, str) for value in position)
+        ):
+            raise RequestError(err_msg="Invalid cursor", status_code=422)
+        return position, reverse
+
+    def get_limit(self, value):
+        if not value:
+            return self.page_size
+        try:
+            limit = int(value)
+        except:
+            raise RequestError(err_msg="Invalid limit params", status_code=422)
+        if limit < 1:
+            raise RequestError(err_msg="Invalid limit params", status_code=422)
+        return min(limit, self.max_page_size)
+
+    def keyset_filter(self, position, reverse):
+        # (a, b) after (x, y) => a > x OR (a = x AND b > y), flipped for descending fields
+        condition = Q()
+        for idx, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            clause = Q(**{f"{name}__{'lt' if descending else 'gt'}": position[idx]})
+            for prev_field, prev_value in zip(self.ordering[:idx], position[:idx]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+            condition |= clause
+        # Postgres can't seek an index with the OR, so the leading field is also
+        # bounded on its own (a >= x), which it uses as the index condition
+        name = self.ordering[0].lstrip("-")
+        descending = self.ordering[0].startswith("-") != reverse
+        bound = Q(**{f"{name}__{'lte' if descending else 'gte'}": position[0]})
+        return bound & condition
+
+    async def paginate(self, queryset, cursor=None, limit=None):
+        """Returns a page of objects and its next/previous cursors"""
+        limit = self.get_limit(limit)
+        reverse = False
+        ordering = self.ordering
+        if cursor:
+            position, reverse = self.decode_cursor(cursor)
+            try:
+                queryset = queryset.filter(self.keyset_filter(position, reverse))
+            except (ValidationError, ValueError, TypeError):
+                raise RequestError(err_msg="Invalid cursor", status_code=422)
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in self.ordering
+            ]
+
+        items = await sync_to_async(list)(queryset.order_by(*ordering)[: limit + 1])
+        has_more = len(items) > limit
+        items = items[:limit]
+        if reverse:
+            items.reverse()
+
+        next_cursor = prev_cursor = None
+        if items:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(items[-1])
+            if cursor and (has_more or not reverse):
+                prev_cursor = self.encode_cursor(items[0], reverse=True)
+        return items, {"next": next_cursor, "previous": prev_cursor}
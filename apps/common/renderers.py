@@ -0,0 +1,58 @@
+from rest_framework.renderers import JSONRenderer
+import math
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def has_non_finite_float(data):
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(has_non_finite_float(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(has_non_finite_float(value) for value in data)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson, with the same bytes for compact unicode output.
+    UUIDs, datetimes, dates and times are encoded natively, anything else orjson
+    can't encode goes through DRF's encoder. Indented or ascii-only output,
+    and payloads orjson rejects (e.g non-str keys), are left to JSONRenderer.
+    orjson writes nan and infinity as null, so payloads holding them are left to
+    JSONRenderer too, which refuses them when `strict`. Floats in exponent
+    notation are written without padding, e.g 1e-7 where JSONRenderer writes 1e-07.
+    """
+
+    options = 0
+    if orjson:
+        # DRF writes UTC offsets as Z
+        options = orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Only payloads with a null may have had a non-finite float in its place
+        if b"null" in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, so the output stays a javascript subset
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
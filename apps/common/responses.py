@@ -1,15 +1,91 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+import hashlib
+
+
+def make_etag(*parts):
+    """
+    Weak ETag of the values a response is built from. Weak, since responses
+    with the same parts are equivalent but not byte-identical (e.g time left).
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
 
 
 class CustomResponse:
-    def success(message, data=None, status_code=200):
+    def success(message, data=None, status_code=200, pagination=None, etag=None):
         response = {
             "status": "success",
             "message": message,
             "data": data,
         }
         response.pop("data", None) if data is None else ...
-        return Response(data=response, status=status_code)
+        if pagination is not None:
+            response["pagination"] = pagination
+        headers = {"ETag": etag} if etag else None
+        return Response(data=response, status=status_code, headers=headers)
+
+    async def astream(request, message, queryset, serializer_class, context=None):
+        """
+        success() of a list, with the items read, serialized and sent in chunks
+        of STREAMING_CHUNK_SIZE. The bytes are the same as success() would send.
+        Built in memory instead for renderers that indent, or when not served over
+        ASGI, where the stream would be buffered anyway.
+        """
+        renderer = request.accepted_renderer
+        media_type = request.accepted_media_type
+        if (
+            not isinstance(request._request, ASGIRequest)
+            or not isinstance(renderer, JSONRenderer)
+            or not renderer.compact
+            or renderer.get_indent(media_type, {}) is not None
+        ):
+            items = await sync_to_async(list)(queryset)
+            serializer = serializer_class(items, many=True, context=context)
+            return CustomResponse.success(message=message, data=serializer.data)
+
+        def render(data):
+            return renderer.render(data, media_type, {"request": request})
+
+        # The envelope as success() renders it, split around the items
+        envelope = render({"status": "success", "message": message, "data": []})
+        head, tail = envelope[: -len(b"]}")], b"]}"
+
+        async def content():
+            yield head
+            chunk, separator = [], b""
+            async for item in queryset.aiterator(
+                chunk_size=settings.STREAMING_CHUNK_SIZE
+            ):
+                chunk.append(item)
+                if len(chunk) == settings.STREAMING_CHUNK_SIZE:
+                    data = serializer_class(chunk, many=True, context=context).data
+                    # Items of the rendered list, without its brackets
+                    yield separator + render(data)[1:-1]
+                    chunk, separator = [], b","
+            if chunk:
+                data = serializer_class(chunk, many=True, context=context).data
+                yield separator + render(data)[1:-1]
+            yield tail
+
+        content_type = media_type
+        if renderer.charset:
+            content_type = f"{content_type}; charset={renderer.charset}"
+        return StreamingHttpResponse(content(), content_type=content_type)
+
+    def not_modified(request, etag):
+        # 304 when the client's If-None-Match holds the etag, weakly compared
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if "*" in etags or etag.removeprefix("W/") in (
+            tag.removeprefix("W/") for tag in etags
+        ):
+            return Response(status=304, headers={"ETag": etag})
+        return None
 
     def error(message, data=None, status_code=400):
         response = {
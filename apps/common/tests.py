@@ -0,0 +1,210 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import Count, Max
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from apps.auctioneer.views import AuctioneerListingsView
+from apps.common.exceptions import RequestError
+from apps.common.management.commands.data_script import CreateData
+from apps.common.models import File
+from apps.common.renderers import ORJSONRenderer
+from apps.common.storage import LocalStorage
+from apps.common.utils import TestUtil
+from apps.listings.models import Bid, Category, Listing
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.renderers import JSONRenderer
+from asgiref.sync import async_to_sync
+from decimal import Decimal
+from unittest import mock
+import tempfile, uuid
+
+
+class TestMedia(APITestCase):
+    upload_url = "/api/v4/media/upload/"
+    files_url = "/api/v4/media/files/"
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.storage = LocalStorage(
+            root=media_root.name, base_url=self.files_url, upload_url=self.upload_url
+        )
+        patcher = mock.patch("apps.common.views.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_local_storage_upload_and_serve(self):
+        image = File.objects.create(resource_type="image/png")
+        key = f"bidout-auction-v4/listings/{image.id}"
+        signature_data = self.storage.sign(key)
+        self.assertEqual(signature_data["upload_url"], self.upload_url)
+
+        # Check that uploads with a bad signature are refused
+        response = self.client.post(
+            self.upload_url,
+            {
+                **signature_data,
+                "signature": "invalid",
+                "file": SimpleUploadedFile("image.png", b"image"),
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 403)
+
+        # Check that signed uploads are stored and served with their url
+        content = b"\x89PNG" * 50000
+        response = self.client.post(
+            self.upload_url,
+            {**signature_data, "file": SimpleUploadedFile("image.png", content)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(self.storage.url(f"{key}.png"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(b"".join(response.streaming_content), content)
+
+        # Check that files are served as their stored type, whatever the extension
+        response = self.client.get(self.storage.url(f"{key}.html"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+        # Check that files without an allowed image type are only downloadable
+        File.objects.filter(id=image.id).update(resource_type="text/html")
+        response = self.client.get(self.storage.url(f"{key}.html"))
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.storage.upload(SimpleUploadedFile("page.html", b"<script>"), "page")
+        response = self.client.get(self.storage.url("page.html"))
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+
+        # Check that keys cannot escape the storage root
+        response = self.client.get(f"{self.files_url}../../etc/passwd")
+        self.assertEqual(response.status_code, 404)
+
+
+class TestGenerateLoadData(APITestCase):
+    def test_generate_load_data(self):
+        call_command(
+            "generate_load_data",
+            users=20,
+            categories=3,
+            listings=50,
+            bids=300,
+            watchlists=100,
+            seed=1,
+        )
+        # Check that the requested bids are generated, consistent with the listings
+        self.assertEqual(Bid.objects.count(), 300)
+        listings = Listing.objects.annotate(
+            total=Count("bids"), highest=Max("bids__amount")
+        ).filter(total__gt=0)
+        for listing in listings:
+            self.assertEqual(listing.bids_count, listing.total)
+            self.assertEqual(listing.highest_bid, listing.highest)
+            self.assertLessEqual(listing.total, 19)
+
+
+class TestRenderers(APITestCase):
+    def test_orjson_renderer_matches_json_renderer(self):
+        data = {
+            "status": "success",
+            "message": _("Listings fetched"),
+            "data": [
+                {
+                    "id": uuid.uuid4(),
+                    "name": 'Lïsting\u2028\u2029 "quoted" 🚀',
+                    "price": Decimal("1000.50"),
+                    "closing_date": timezone.now(),
+                    "date": timezone.now().date(),
+                    "bids": (1, 2.5, None, True),
+                    "nested": {"empty": [], "list": [{}]},
+                }
+            ],
+        }
+        # Verify that the bytes match, including fallbacks and indented output
+        for payload in (data, {"big": 2**70}, {1: "int key"}, None):
+            for media_type in ("application/json", "application/json; indent=4"):
+                self.assertEqual(
+                    ORJSONRenderer().render(payload, media_type),
+                    JSONRenderer().render(payload, media_type),
+                )
+
+        # Verify that non-finite floats are refused, as JSONRenderer does
+        for value in (float("nan"), float("inf"), -float("inf")):
+            payload = {"data": [{"price": value, "name": None}]}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(payload, "application/json")
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render(payload, "application/json")
+            renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+            renderer.strict = orjson_renderer.strict = False
+            self.assertEqual(
+                orjson_renderer.render(payload, "application/json"),
+                renderer.render(payload, "application/json"),
+            )
+
+        # Verify that responses are rendered with it
+        response = self.client.get("/api/v4/general/site-detail/")
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+
+
+class TestPermissions(APITestCase):
+    listings_url = "/api/v4/auctioneer/listings/"
+
+    def test_options_checks_async_permissions(self):
+        # Verify that an unauthenticated OPTIONS request to a protected view fails
+        response = self.client.options(self.listings_url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            response.json(),
+            {"status": "failure", "message": "Auth Bearer not provided!"},
+        )
+
+        # Verify that sync permission checks don't pass on an unawaited coroutine
+        view = AuctioneerListingsView()
+        request = APIRequestFactory().get(self.listings_url)
+        with self.assertRaises(RequestError):
+            view.check_permissions(view.initialize_request(request))
+
+        user = TestUtil.verified_user()
+        request = APIRequestFactory().get(
+            self.listings_url,
+            HTTP_AUTHORIZATION=f"Bearer {TestUtil.auth_token(user)}",
+        )
+        view.check_permissions(view.initialize_request(request))
+
+
+class TestDataScript(APITestCase):
+    def test_create_listings_counts_categories(self):
+        # Verify that the bulk created listings are counted in their categories
+        create_data = CreateData()
+        auctioneer = TestUtil.verified_user()
+        category_ids = async_to_sync(create_data.create_categories)()
+        with mock.patch.object(CreateData, "upload_images"):
+            async_to_sync(create_data.create_listings)(category_ids, auctioneer.id)
+        counts = Category.objects.values_list("active_listings_count", flat=True)
+        self.assertEqual(sum(counts), Listing.objects.count())
+        for category in Category.objects.all():
+            self.assertEqual(
+                category.active_listings_count,
+                Listing.objects.filter(category=category, active=True).count(),
+            )
+
+    def test_upload_images_counts_failures(self):
+        # Verify that only successful uploads are counted, failures are reported
+        async def aupload(file, key):
+            if key.endswith("broken"):
+                raise OSError("refused")
+
+        uploads = [(__file__, "first"), (__file__, "broken"), (__file__, "second")]
+        with mock.patch(
+            "apps.common.file_processors.storage.aupload", side_effect=aupload
+        ), self.assertLogs(
+            "apps.common.management.commands.data_script", level="ERROR"
+        ) as logs:
+            uploaded = async_to_sync(CreateData().upload_images)(uploads)
+        self.assertEqual(uploaded, 2)
+        self.assertIn("Failed to upload 1 images", logs.output[-1])
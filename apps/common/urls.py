@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("upload/", views.MediaUploadView.as_view()),
+    path("files/<path:key>", views.MediaFileView.as_view()),
+]
@@ -11,11 +11,11 @@ from uuid import UUID
 
 
 class IsAuthenticatedCustom(BasePermission):
-    def has_permission(self, request, view):
+    async def has_permission(self, request, view):
         http_auth = request.META.get("HTTP_AUTHORIZATION")
         if not http_auth:
             raise RequestError(err_msg="Auth Bearer not provided!", status_code=401)
-        user = Authentication.decodeAuthorization(http_auth)
+        user = await Authentication.decodeAuthorization(http_auth)
         if not user:
             raise RequestError(
                 err_msg="Auth Token is Invalid or Expired!", status_code=401
@@ -27,22 +27,18 @@ class IsAuthenticatedCustom(BasePermission):
 
 
 class IsGuestOrAuthenticatedCustom(BasePermission):
-    def has_permission(self, request, view):
+    async def has_permission(self, request, view):
         http_auth = request.META.get("HTTP_AUTHORIZATION")
-        guest_id = request.headers.get("Guestuserid")
+        guest_id = is_uuid(request.headers.get("Guestuserid"))
         if http_auth:
-            user = Authentication.decodeAuthorization(http_auth)
+            user = await Authentication.decodeAuthorization(http_auth)
             if not user:
                 raise RequestError(
                     err_msg="Auth Token is Invalid or Expired!", status_code=401
                 )
             request.user = user
         elif guest_id:
-            guest = GuestUser.objects.filter(id=guest_id)
-            if guest.exists():
-                request.user = guest.get()
-            else:
-                request.user = None
+            request.user = await GuestUser.objects.get_or_none(id=guest_id)
         else:
             request.user = None
         return True
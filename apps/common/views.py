@@ -0,0 +1,156 @@
+from django.http import FileResponse
+from adrf.views import APIView as AsyncAPIView
+from drf_spectacular.utils import extend_schema
+from .exceptions import RequestError
+from .file_types import ALLOWED_IMAGE_TYPES
+from .file_processors import storage
+from .models import File
+from .responses import CustomResponse
+from .storage import LocalStorage
+from asgiref.sync import async_to_sync, sync_to_async
+import asyncio, os, uuid
+
+
+class APIView(AsyncAPIView):
+    """
+    adrf's APIView with the request checks run on the event loop instead of a worker thread.
+    Permissions with an async has_permission are awaited, sync ones still go through a thread.
+    There are no authentication classes, the permissions resolve and set request.user.
+    """
+
+    authentication_classes = ()
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            # Get the appropriate handler method
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = await handler(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        # Perform content negotiation and store the accepted info on the request
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        # Determine the API version, if versioning is in use.
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.acheck_permissions(request)
+        # Throttle history lives in the default (in-memory) cache
+        self.check_throttles(request)
+
+    def check_permissions(self, request):
+        # DRF's sync callers (OPTIONS metadata, the browsable API) would get a truthy,
+        # unawaited coroutine from async has_permission, so they run the async check
+        async_to_sync(self.acheck_permissions)(request)
+
+    def check_object_permissions(self, request, obj):
+        async_to_sync(self.acheck_object_permissions)(request, obj)
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if asyncio.iscoroutinefunction(permission.has_object_permission):
+                allowed = await permission.has_object_permission(request, self, obj)
+            else:
+                allowed = await sync_to_async(permission.has_object_permission)(
+                    request, self, obj
+                )
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if asyncio.iscoroutinefunction(permission.has_permission):
+                allowed = await permission.has_permission(request, self)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+
+class MediaUploadView(APIView):
+    @extend_schema(
+        summary="Upload a file",
+        description="This endpoint stores a file sent as multipart 'file' with the public_id, timestamp and signature from its file_upload_data. Only available with local file storage",
+    )
+    async def post(self, request):
+        if not isinstance(storage, LocalStorage):
+            raise RequestError(err_msg="Not Found", status_code=404)
+        data = request.data
+        key = data.get("public_id")
+        file = data.get("file")
+        if not file:
+            raise RequestError(
+                err_msg="Invalid entry", data={"file": "No file sent"}, status_code=422
+            )
+        if not key or not storage.verify(
+            key, data.get("timestamp"), data.get("signature")
+        ):
+            raise RequestError(err_msg="Invalid upload signature", status_code=403)
+        await storage.aupload(file, key)
+        return CustomResponse.success(
+            message="File uploaded", data={"public_id": key}, status_code=201
+        )
+
+
+class MediaFileView(APIView):
+    @extend_schema(
+        summary="Retrieve a file",
+        description="This endpoint serves a stored file. Only available with local file storage",
+    )
+    async def get(self, request, *args, **kwargs):
+        key = kwargs.get("key")
+        path = None
+        if isinstance(storage, LocalStorage):
+            try:
+                path = storage.find(key)
+            except ValueError:
+                path = None
+        if not path:
+            raise RequestError(err_msg="Not Found", status_code=404)
+
+        # Served as the image type stored for the file, never the one the url
+        # extension suggests, so uploads can't be fetched as e.g html
+        content_type = "application/octet-stream"
+        try:
+            file_id = uuid.UUID(os.path.splitext(os.path.basename(key))[0])
+        except ValueError:
+            file_id = None
+        file = file_id and await File.objects.get_or_none(id=file_id)
+        if file and file.resource_type in ALLOWED_IMAGE_TYPES:
+            content_type = file.resource_type
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["X-Content-Type-Options"] = "nosniff"
+        # Keeps scripts in svg images from running when opened directly
+        response["Content-Security-Policy"] = "default-src 'none'; sandbox"
+        return response
@@ -0,0 +1,51 @@
+from apps.common.broadcast import broadcast
+from .models import SiteDetail
+from asgiref.sync import sync_to_async
+import threading
+
+
+class SiteDetailCache:
+    """
+    Process-level copy of the SiteDetail singleton, so reads need no query.
+    Concurrent first reads share a single load. Saving or deleting the row clears
+    the copy in every worker through the broadcast.
+    """
+
+    channel = "site-detail"
+
+    def __init__(self):
+        self.sitedetail = None
+        self.lock = threading.Lock()
+        self.registered = False
+        # Bumped on invalidation, so a load racing one does not keep stale data
+        self.generation = 0
+
+    def load(self):
+        with self.lock:
+            if self.sitedetail is None:
+                if not self.registered:
+                    broadcast.subscribe(self.channel, self.clear)
+                    self.registered = True
+                generation = self.generation
+                sitedetail, _ = SiteDetail.objects.get_or_create()
+                if generation == self.generation:
+                    self.sitedetail = sitedetail
+                return sitedetail
+            return self.sitedetail
+
+    async def aget(self):
+        sitedetail = self.sitedetail
+        if sitedetail is None:
+            sitedetail = await sync_to_async(self.load)()
+        return sitedetail
+
+    def clear(self, message=None):
+        self.generation += 1
+        self.sitedetail = None
+
+    def invalidate(self):
+        self.clear()
+        broadcast.publish(self.channel, {})
+
+
+site_detail_cache = SiteDetailCache()
@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import site_detail_cache
+from .models import SiteDetail
+
+
+@receiver(post_save, sender=SiteDetail)
+@receiver(post_delete, sender=SiteDetail)
+def sitedetail_changed(sender, instance, **kwargs):
+    # After commit, so no worker reloads the old row in between
+    transaction.on_commit(site_detail_cache.invalidate)
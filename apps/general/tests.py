@@ -1,6 +1,8 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
-from apps.general.models import Review
+from apps.general.models import Review, SiteDetail
 from apps.common.utils import TestUtil
 from unittest import mock
 
@@ -29,6 +31,18 @@ class TestGeneral(APITestCase):
         keys = ["name", "email", "phone", "address", "fb", "tw", "wh", "ig"]
         self.assertTrue(all(item in result["data"] for item in keys))
 
+        # Check that the site detail is served from memory
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.sitedetail_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+
+        # Check that saving the site detail refreshes it
+        with self.captureOnCommitCallbacks(execute=True):
+            SiteDetail.objects.update_or_create(defaults={"name": "New Auction House"})
+        response = self.client.get(self.sitedetail_url)
+        self.assertEqual(response.json()["data"]["name"], "New Auction House")
+
     def test_subscribe(self):
         # Check response validity
         response = self.client.post(
@@ -46,7 +60,11 @@ class TestGeneral(APITestCase):
 
     def test_retrieve_reviews(self):
         # Check response validity
-        response = self.client.get(self.reviews_url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.reviews_url)
+        self.assertTrue(
+            any("LIMIT 3" in query["sql"] for query in ctx.captured_queries)
+        )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
             response.json(),
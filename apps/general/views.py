@@ -1,8 +1,9 @@
-from adrf.views import APIView
 from drf_spectacular.utils import extend_schema
 from apps.common.responses import CustomResponse
+from apps.common.views import APIView
 
-from apps.general.models import Review, SiteDetail, Subscriber
+from apps.general.cache import site_detail_cache
+from apps.general.models import Review, Subscriber
 from apps.general.serializers import (
     ReviewsSerializer,
     SiteDetailSerializer,
@@ -19,7 +20,7 @@ class SiteDetailView(APIView):
         description="This endpoint retrieves few details of the site/application",
     )
     async def get(self, request):
-        sitedetail, created = await SiteDetail.objects.aget_or_create()
+        sitedetail = await site_detail_cache.aget()
         serializer = self.serializer_class(sitedetail)
         return CustomResponse.success(
             message="Site Details fetched", data=serializer.data
@@ -51,10 +52,10 @@ class ReviewsView(APIView):
         description="This endpoint retrieves a few reviews of the application",
     )
     async def get(self, request):
-        reviews = (
-            await sync_to_async(list)(
-                Review.objects.filter(show=True).select_related("reviewer")
-            )
-        )[:3]
+        reviews = await sync_to_async(list)(
+            Review.objects.filter(show=True)
+            .select_related("reviewer", "reviewer__avatar")
+            .limit(3)
+        )
         serializer = self.serializer_class(reviews, many=True)
         return CustomResponse.success(message="Reviews fetched", data=serializer.data)
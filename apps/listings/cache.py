@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.core.cache import caches
+from apps.common.broadcast import broadcast
+from apps.common.cache import LRUCache
+import threading, uuid
+
+
+class LocalCardCache:
+    """
+    Keeps serialized listing cards in an in-process LRU.
+    Deletions are published through the broadcast, so every worker evicts them.
+    """
+
+    channel = "listing-cards"
+    # Ids per message, keeping each under the broadcast's 8KB limit
+    batch_size = 100
+
+    def __init__(self, max_entries):
+        self.cache = LRUCache(maxsize=max_entries)
+        self.lock = threading.Lock()
+        self.registered = False
+        # Bumped on every eviction, so cards built while one happens are not cached
+        self.generation = 0
+
+    def get(self, listing_id, version):
+        entry = self.cache.get(listing_id)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, listing_id, version, card, generation=None):
+        with self.lock:
+            if not self.registered:
+                broadcast.subscribe(self.channel, self.evict)
+                self.registered = True
+            if generation is None or generation == self.generation:
+                self.cache.set(listing_id, (version, card))
+
+    def evict(self, message):
+        with self.lock:
+            self.generation += 1
+            self.cache.delete_many(
+                [uuid.UUID(listing_id) for listing_id in message["listing_ids"]]
+            )
+
+    def delete_many(self, listing_ids):
+        listing_ids = [str(listing_id) for listing_id in listing_ids]
+        for idx in range(0, len(listing_ids), self.batch_size):
+            message = {"listing_ids": listing_ids[idx : idx + self.batch_size]}
+            self.evict(message)
+            broadcast.publish(self.channel, message)
+
+
+class SharedCardCache:
+    """Keeps serialized listing cards in a configured django cache (e.g redis), shared by all workers"""
+
+    def __init__(self, alias, timeout):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def key(self, listing_id):
+        return f"listing-card:{listing_id}"
+
+    def get(self, listing_id, version):
+        entry = self.cache.get(self.key(listing_id))
+        if entry is None or entry[0] != version.isoformat():
+            return None
+        return entry[1]
+
+    # Deletions apply to every worker at once, nothing to race with
+    generation = 0
+
+    def set(self, listing_id, version, card, generation=None):
+        self.cache.set(self.key(listing_id), (version.isoformat(), card), self.timeout)
+
+    def delete_many(self, listing_ids):
+        self.cache.delete_many([self.key(listing_id) for listing_id in listing_ids])
+
+
+def get_card_cache():
+    if settings.LISTING_CARD_CACHE_BACKEND == "shared":
+        return SharedCardCache(
+            alias=settings.LISTING_CARD_CACHE_ALIAS,
+            timeout=settings.LISTING_CARD_CACHE_TIMEOUT,
+        )
+    return LocalCardCache(max_entries=settings.LISTING_CARD_CACHE_SIZE)
+
+
+# Client independent part of ListingSerializer output, keyed by listing id and updated_at
+card_cache = get_card_cache()
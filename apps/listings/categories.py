@@ -0,0 +1,107 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from apps.common.broadcast import broadcast
+from .models import Category, Listing
+from asgiref.sync import sync_to_async
+import threading
+
+
+class CategoryRegistry:
+    """
+    In-memory catalogue of categories, so slugs resolve without a query.
+    Reloaded on first use after a category or its active listings count changes,
+    in every worker through the broadcast. `version` goes up with each reload.
+    """
+
+    channel = "categories"
+
+    def __init__(self):
+        # slug -> category row, in catalogue order
+        self.categories = None
+        self.version = 0
+        self.lock = threading.Lock()
+        self.registered = False
+
+    def load(self):
+        with self.lock:
+            if self.categories is None:
+                if not self.registered:
+                    broadcast.subscribe(self.channel, self.clear)
+                    self.registered = True
+                version = self.version
+                rows = Category.objects.order_by("name").values(
+                    "id", "name", "slug", "active_listings_count"
+                )
+                categories = {row["slug"]: row for row in rows}
+                if version == self.version:
+                    self.categories = categories
+                return categories
+            return self.categories
+
+    async def aload(self):
+        categories = self.categories
+        if categories is None:
+            categories = await sync_to_async(self.load)()
+        return categories
+
+    async def aget(self, slug):
+        row = (await self.aload()).get(slug)
+        if not row:
+            return None
+        return Category(id=row["id"], name=row["name"], slug=row["slug"])
+
+    async def acatalogue(self):
+        return [
+            {
+                "name": row["name"],
+                "slug": row["slug"],
+                "active_listings_count": row["active_listings_count"],
+            }
+            for row in (await self.aload()).values()
+        ]
+
+    def clear(self, message=None):
+        self.version += 1
+        self.categories = None
+
+    def invalidate(self):
+        self.clear()
+        broadcast.publish(self.channel, {})
+
+    def invalidate_on_commit(self):
+        # Cleared now for this worker's own transaction, everywhere once committed
+        self.clear()
+        transaction.on_commit(self.invalidate)
+
+
+category_registry = CategoryRegistry()
+
+
+def adjust_active_listings_counts(added=(), removed=()):
+    """Applies category ids gaining and losing active listings to the stored counts"""
+    deltas = Counter(category_id for category_id in added if category_id)
+    deltas.subtract(category_id for category_id in removed if category_id)
+    changed = False
+    for category_id, delta in deltas.items():
+        if delta:
+            Category.objects.filter(id=category_id).update(
+                active_listings_count=F("active_listings_count") + delta
+            )
+            changed = True
+    if changed:
+        category_registry.invalidate_on_commit()
+
+
+def recount_active_listings_counts():
+    """Recomputes the stored counts from the listings, after writes that skip the signals"""
+    active = (
+        Listing.objects.filter(category=OuterRef("pk"), active=True)
+        .order_by()
+        .values("category")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Category.objects.update(active_listings_count=Coalesce(Subquery(active), 0))
+    category_registry.invalidate_on_commit()
@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+from datetime import timedelta
+from .categories import adjust_active_listings_counts
+from .models import Bid, Listing
+import heapq, logging
+
+logger = logging.getLogger(__name__)
+
+
+class AuctionCloser:
+    """
+    Closes listings at their closing_date.
+    Upcoming deadlines (within `horizon`) are kept in a min-heap, refreshed from the
+    (active, closing_date) index. Due listings are flipped to inactive in batched
+    UPDATEs and their highest bid is recorded as the winning bid.
+    """
+
+    def __init__(self, horizon=timedelta(minutes=5), batch_size=500):
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.heap = []
+        self.scheduled = {}
+        self.metrics = {
+            "scheduled": 0,
+            "closed": 0,
+            "last_lag_seconds": 0.0,
+            "max_lag_seconds": 0.0,
+        }
+
+    def refresh(self):
+        # Schedules active listings closing within the horizon, including overdue ones
+        upcoming = Listing.objects.filter(
+            active=True, closing_date__lte=timezone.now() + self.horizon
+        ).values_list("id", "closing_date")
+        for listing_id, closing_date in upcoming.iterator():
+            if self.scheduled.get(listing_id) != closing_date:
+                self.scheduled[listing_id] = closing_date
+                heapq.heappush(self.heap, (closing_date, listing_id))
+        self.metrics["scheduled"] = len(self.scheduled)
+
+    def next_deadline(self):
+        return self.heap[0][0] if self.heap else None
+
+    def close_due(self):
+        now = timezone.now()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            closing_date, listing_id = heapq.heappop(self.heap)
+            if self.scheduled.get(listing_id) != closing_date:
+                # Stale entry, the closing date was changed after scheduling
+                continue
+            del self.scheduled[listing_id]
+            due.append(listing_id)
+
+        closed = 0
+        for idx in range(0, len(due), self.batch_size):
+            closed += self.close(due[idx : idx + self.batch_size])
+        self.metrics["scheduled"] = len(self.scheduled)
+        return closed
+
+    def close(self, listing_ids):
+        # Returns how many of the listings were closed
+        with transaction.atomic():
+            # Recheck under lock, a listing may have been extended or closed meanwhile
+            listings = list(
+                Listing.objects.select_for_update()
+                .filter(id__in=listing_ids, active=True, closing_date__lte=Now())
+                .values_list("id", "closing_date", "category_id")
+            )
+            if not listings:
+                return 0
+            closed_ids = [listing_id for listing_id, _, _ in listings]
+            closed = Listing.objects.filter(id__in=closed_ids).update(
+                active=False, updated_at=Now()
+            )
+            adjust_active_listings_counts(
+                removed=[category_id for _, _, category_id in listings]
+            )
+            winners = (
+                Bid.objects.filter(listing_id__in=closed_ids)
+                .order_by("listing_id", "-amount")
+                .distinct("listing_id")
+                .values_list("listing_id", "id")
+            )
+            Listing.objects.bulk_update(
+                [
+                    Listing(id=listing_id, winning_bid_id=bid_id)
+                    for listing_id, bid_id in winners
+                ],
+                ["winning_bid"],
+            )
+
+        now = timezone.now()
+        lags = [(now - closing_date).total_seconds() for _, closing_date, _ in listings]
+        self.metrics["closed"] += closed
+        self.metrics["last_lag_seconds"] = max(lags)
+        self.metrics["max_lag_seconds"] = max(self.metrics["max_lag_seconds"], *lags)
+        logger.info(
+            "Closed %s listings, lag behind deadline %.3fs",
+            closed,
+            self.metrics["last_lag_seconds"],
+        )
+        return closed
@@ -0,0 +1,91 @@
+from django.conf import settings
+from apps.common.broadcast import broadcast
+import asyncio, json, threading, time
+
+
+class BidHub:
+    """
+    Fans bid events out to the live subscribers of each listing.
+    Events travel through the configured broadcast so every worker's subscribers get them.
+    Each subscriber owns a bounded queue; a slow one loses its oldest events, never blocks publishers.
+    """
+
+    channel = "listing-bids"
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.registered = False
+
+    def subscribe(self, listing_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if not self.registered:
+                broadcast.subscribe(self.channel, self.dispatch)
+                self.registered = True
+            self.subscribers.setdefault(str(listing_id), {})[queue] = loop
+        return queue
+
+    def unsubscribe(self, listing_id, queue):
+        with self.lock:
+            queues = self.subscribers.get(str(listing_id), {})
+            queues.pop(queue, None)
+            if not queues:
+                self.subscribers.pop(str(listing_id), None)
+
+    def dispatch(self, message):
+        with self.lock:
+            queues = list(self.subscribers.get(message["listing_id"], {}).items())
+        for queue, loop in queues:
+            loop.call_soon_threadsafe(self.put, queue, message)
+
+    @staticmethod
+    def put(queue, message):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    async def apublish(self, listing_id, event):
+        await broadcast.apublish(self.channel, {"listing_id": str(listing_id), **event})
+
+
+bid_hub = BidHub()
+
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def bid_events(listing):
+    """
+    Server-sent events for a listing: a snapshot, then every new bid.
+    Streams are closed after BID_STREAM_MAX_SECONDS; EventSource clients reconnect on their own.
+    """
+    queue = bid_hub.subscribe(listing.id)
+    deadline = time.monotonic() + settings.BID_STREAM_MAX_SECONDS
+    try:
+        yield "retry: 3000\n\n"
+        yield sse_message(
+            "snapshot",
+            {
+                "listing": listing.name,
+                "highest_bid": str(listing.highest_bid),
+                "bids_count": listing.bids_count,
+            },
+        )
+        while time.monotonic() < deadline:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.BID_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_message(
+                "bid",
+                {key: value for key, value in event.items() if key != "listing_id"},
+            )
+    finally:
+        bid_hub.unsubscribe(listing.id, queue)
@@ -0,0 +1,155 @@
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter
+from apps.common.exceptions import RequestError
+from apps.common.paginators import CursorPaginator
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+# Each is backed by a (field, id) index and a (category, field, id) index,
+# scanned backwards for the reversed sort, and by partial ones of active listings
+SORT_FIELDS = ("created_at", "price", "highest_bid", "bids_count", "closing_date")
+
+# Range filter -> (field, lookup). A range only bounds the sorted index scan when it
+# is on the sorted field, so other sorts are rejected instead of scanning the table
+RANGE_FILTERS = {
+    "min_price": ("price", "gte"),
+    "max_price": ("price", "lte"),
+    "min_bids": ("bids_count", "gte"),
+    "max_bids": ("bids_count", "lte"),
+    "closing_within": ("closing_date", "lte"),
+}
+
+# Sort used when only a range filter is given
+DEFAULT_SORTS = {
+    "price": "price",
+    "bids_count": "-bids_count",
+    "closing_date": "closing_date",
+}
+
+LISTING_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        name="sort",
+        description=f"One of {', '.join(SORT_FIELDS)}, prefixed with '-' for descending. Defaults to -created_at",
+        required=False,
+        type=str,
+    ),
+    OpenApiParameter(
+        name="active",
+        description="true to only retrieve active listings",
+        required=False,
+        type=bool,
+    ),
+    OpenApiParameter(
+        name="min_price",
+        description="Minimum price, requires sorting by price",
+        required=False,
+        type=float,
+    ),
+    OpenApiParameter(
+        name="max_price",
+        description="Maximum price, requires sorting by price",
+        required=False,
+        type=float,
+    ),
+    OpenApiParameter(
+        name="min_bids",
+        description="Minimum bids count, requires sorting by bids_count",
+        required=False,
+        type=int,
+    ),
+    OpenApiParameter(
+        name="max_bids",
+        description="Maximum bids count, requires sorting by bids_count",
+        required=False,
+        type=int,
+    ),
+    OpenApiParameter(
+        name="closing_within",
+        description="Only listings closing within this many hours, requires sorting by closing_date",
+        required=False,
+        type=float,
+    ),
+]
+
+
+class ListingFilters:
+    """
+    Filters and sort of a listings feed, parsed from query params.
+    Only combinations an index can serve in order are accepted.
+    """
+
+    paginators = {
+        f"{prefix}{field}": CursorPaginator(
+            ordering=(f"{prefix}{field}", f"{prefix}id")
+        )
+        for field in SORT_FIELDS
+        for prefix in ("", "-")
+    }
+
+    def __init__(self, params):
+        self.filters = {}
+        active = params.get("active")
+        if active:
+            if active not in ("true", "false"):
+                raise RequestError(err_msg="Invalid active params", status_code=422)
+            # Only active listings have their own indexes, closed ones would be
+            # found by scanning past every active listing
+            if active == "false":
+                raise RequestError(
+                    err_msg="Filtering by inactive listings isn't supported",
+                    status_code=422,
+                )
+            self.filters["active"] = True
+
+        ranged_field = None
+        for name, (field, lookup) in RANGE_FILTERS.items():
+            value = params.get(name)
+            if not value:
+                continue
+            if ranged_field and ranged_field != field:
+                raise RequestError(
+                    err_msg=f"Filtering by {name} can't be combined with other ranges",
+                    status_code=422,
+                )
+            ranged_field = field
+            if name == "closing_within":
+                hours = self.parse(name, value, float)
+                now = timezone.now()
+                self.filters["closing_date__gte"] = now
+                try:
+                    value = now + timedelta(hours=hours)
+                except OverflowError:
+                    raise RequestError(
+                        err_msg=f"Invalid {name} params", status_code=422
+                    )
+            elif field == "price":
+                value = self.parse(name, value, Decimal)
+            else:
+                value = self.parse(name, value, int)
+            self.filters[f"{field}__{lookup}"] = value
+
+        sort = params.get("sort") or DEFAULT_SORTS.get(ranged_field, "-created_at")
+        if sort not in self.paginators:
+            raise RequestError(err_msg="Invalid sort", status_code=422)
+        if ranged_field and sort.lstrip("-") != ranged_field:
+            raise RequestError(
+                err_msg=f"Filtering by {ranged_field} requires sorting by {ranged_field}",
+                status_code=422,
+            )
+        self.paginator = self.paginators[sort]
+        self.ordering = self.paginator.ordering
+
+    @staticmethod
+    def parse(name, value, cast):
+        try:
+            value = cast(value)
+            # Also rejects nan and infinity
+            valid = 0 <= value < 10**12
+        except (ValueError, InvalidOperation):
+            valid = False
+        if not valid:
+            raise RequestError(err_msg=f"Invalid {name} params", status_code=422)
+        return value
+
+    def apply(self, queryset):
+        return queryset.filter(**self.filters)
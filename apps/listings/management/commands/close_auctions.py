@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+from apps.listings.closing import AuctionCloser
+import logging, time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Closes listings at their closing date and records the winning bids"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh", type=int, default=30, help="Seconds between deadline scans"
+        )
+        parser.add_argument(
+            "--horizon", type=int, default=300, help="Seconds of deadlines to schedule"
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--once", action="store_true", help="Close overdue listings and exit"
+        )
+
+    def handle(self, **options) -> None:
+        closer = AuctionCloser(
+            horizon=timedelta(seconds=options["horizon"]),
+            batch_size=options["batch_size"],
+        )
+        refresh_every = options["refresh"]
+        logger.info("Auction closer started")
+        next_refresh = 0
+        while True:
+            if time.monotonic() >= next_refresh:
+                closer.refresh()
+                next_refresh = time.monotonic() + refresh_every
+                logger.info("Auction closer metrics: %s", closer.metrics)
+            closer.close_due()
+            if options["once"]:
+                break
+
+            # Sleep until the next deadline or scan, whichever comes first
+            sleep_for = next_refresh - time.monotonic()
+            deadline = closer.next_deadline()
+            if deadline:
+                sleep_for = min(sleep_for, (deadline - timezone.now()).total_seconds())
+            time.sleep(max(sleep_for, 0.05))
@@ -0,0 +1,46 @@
+from django.db.models import Exists, OuterRef, Q, Value
+from apps.common.managers import GetOrNoneManager, GetOrNoneQuerySet
+
+
+class ListingQuerySet(GetOrNoneQuerySet):
+    """Custom QuerySet for listing reads"""
+
+    def with_watch_status(self, client):
+        # Annotates 'watchlist' with whether the client (user or guest) watches each listing.
+        # A correlated EXISTS keeps the whole page in a single query.
+        if not client:
+            return self.annotate(watchlist=Value(False))
+
+        from .models import WatchList
+
+        watchlists = WatchList.objects.filter(
+            Q(user_id=client.id) | Q(guest_id=client.id), listing_id=OuterRef("id")
+        )
+        return self.annotate(watchlist=Exists(watchlists))
+
+    def versions(self):
+        # What a listing card changes with, read in place of the card itself for ETags
+        return self.values_list(
+            "id",
+            "updated_at",
+            "bids_count",
+            "highest_bid",
+            "active",
+            "category_id",
+            "category__updated_at",
+            "image__updated_at",
+            "auctioneer__updated_at",
+            "auctioneer__avatar__updated_at",
+            "watchlist",
+        )
+
+
+class ListingManager(GetOrNoneManager):
+    """Adds listing read helpers to objects"""
+
+    def get_queryset(self):
+        # The search vector is only needed by the database
+        return ListingQuerySet(self.model, using=self._db).defer("search_vector")
+
+    def with_watch_status(self, client):
+        return self.get_queryset().with_watch_status(client)
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:51
+
+from decimal import Decimal
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("common", "0001_initial"),
+        ("listings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="listing",
+            options={"ordering": ["-created_at"]},
+        ),
+        migrations.AlterField(
+            model_name="bid",
+            name="amount",
+            field=models.DecimalField(
+                decimal_places=2,
+                max_digits=10,
+                validators=[django.core.validators.MinValueValidator(Decimal("0.01"))],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="bid",
+            name="listing",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bids",
+                to="listings.listing",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="bid",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bids",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="listing",
+            name="price",
+            field=models.DecimalField(
+                decimal_places=2,
+                max_digits=10,
+                validators=[django.core.validators.MinValueValidator(Decimal("0.01"))],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="watchlist",
+            name="guest",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="watchlists",
+                to="common.guestuser",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="watchlist",
+            name="listing",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="watchlists",
+                to="listings.listing",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="listing_created_at_id_idx"
+            ),
+        ),
+    ]
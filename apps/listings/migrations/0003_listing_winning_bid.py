@@ -0,0 +1,30 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0002_listing_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="winning_bid",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="listings.bid",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["active", "closing_date"], name="listing_active_closing_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.2 on 2026-10-17 22:11
+
+from django.db import migrations, models
+
+
+def count_active_listings(apps, schema_editor):
+    Category = apps.get_model("listings", "Category")
+    Listing = apps.get_model("listings", "Listing")
+    counts = Listing.objects.filter(active=True, category__isnull=False).values(
+        "category_id"
+    )
+    for row in counts.annotate(total=models.Count("id")):
+        Category.objects.filter(id=row["category_id"]).update(
+            active_listings_count=row["total"]
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0003_listing_winning_bid"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="active_listings_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_active_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.2 on 2026-10-17 22:22
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Runs on every insert and on updates writing name, desc or the vector itself,
+# so bulk inserts and COPY are covered while bid count updates skip it
+CREATE_TRIGGER = """
+CREATE FUNCTION listings_listing_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW."desc", '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER listings_listing_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, "desc", search_vector ON listings_listing
+FOR EACH ROW EXECUTE FUNCTION listings_listing_search_vector_update();
+
+UPDATE listings_listing SET search_vector = NULL;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER listings_listing_search_vector_trigger ON listings_listing;
+DROP FUNCTION listings_listing_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0004_category_active_listings_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.AddIndex(
+            model_name="listing",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="listing_search_vector_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.2 on 2026-10-17 22:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0005_listing_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="listing",
+            name="category",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="listings.category",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(fields=["price", "id"], name="listing_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["highest_bid", "id"], name="listing_highest_bid_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["bids_count", "id"], name="listing_bids_count_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["closing_date", "id"], name="listing_closing_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "-created_at", "-id"],
+                name="listing_cat_created_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "price", "id"], name="listing_cat_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "highest_bid", "id"],
+                name="listing_cat_highest_bid_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "bids_count", "id"],
+                name="listing_cat_bids_count_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "closing_date", "id"],
+                name="listing_cat_closing_date_idx",
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -7,11 +9,14 @@ from apps.common.models import BaseModel, File, GuestUser
 from autoslug import AutoSlugField
 from apps.common.file_processors import FileProcessor
 from decimal import Decimal
+from .managers import ListingManager
 
 
 class Category(BaseModel):
     name = models.CharField(max_length=30, unique=True)
     slug = AutoSlugField(populate_from="name", unique=True, always_update=True)
+    # Kept in step by the listings signals and the auction closer
+    active_listings_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -30,7 +35,10 @@ class Listing(BaseModel):
     slug = AutoSlugField(populate_from="name", unique=True, always_update=True)
     desc = models.TextField()
 
-    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
+    # Indexed by the (category, field, id) sort indexes
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, db_index=False
+    )
 
     price = models.DecimalField(
         max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal("0.01"))]
@@ -41,10 +49,30 @@ class Listing(BaseModel):
     active = models.BooleanField(default=True)
 
     image = models.ForeignKey(File, on_delete=models.SET_NULL, null=True)
+    # Set by the auction closer when the listing closes
+    winning_bid = models.ForeignKey(
+        "Bid", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    # Weighted name and desc lexemes, kept up to date by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ListingManager()
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "category_id" in field_names and "active" in field_names:
+            # The category whose active listings count includes this listing
+            instance._counted_category_id = instance.counted_category_id
+        return instance
+
+    @property
+    def counted_category_id(self):
+        return self.category_id if self.active else None
+
     @property
     def time_left_seconds(self):
         remaining_time = self.closing_date - timezone.now()
@@ -58,18 +86,77 @@ class Listing(BaseModel):
         return self.time_left_seconds
 
     @property
-    def get_image(self):
+    def image_file(self):
+        # (key, folder, content_type) of the image, as FileProcessor takes them
         image = self.image
         if image:
-            return FileProcessor.generate_file_url(
-                key=self.image_id,
-                folder="listings",
-                content_type=image.resource_type,
-            )
+            return (self.image_id, "listings", image.resource_type)
+        return None
+
+    @property
+    def get_image(self):
+        image_file = self.image_file
+        if image_file:
+            return FileProcessor.generate_file_url(*image_file)
         return None
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Backs keyset pagination of the listings feed
+            models.Index(
+                fields=["-created_at", "-id"], name="listing_created_at_id_idx"
+            ),
+            # Backs the auction closer's scan of upcoming deadlines
+            models.Index(
+                fields=["active", "closing_date"], name="listing_active_closing_idx"
+            ),
+            # Back the sorts of the listings and category feeds, see filters.py
+            *[
+                models.Index(fields=[field, "id"], name=f"listing_{field}_id_idx")
+                for field in ("price", "highest_bid", "bids_count", "closing_date")
+            ],
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                name="listing_cat_created_at_idx",
+            ),
+            *[
+                models.Index(
+                    fields=["category", field, "id"], name=f"listing_cat_{field}_idx"
+                )
+                for field in ("price", "highest_bid", "bids_count", "closing_date")
+            ],
+            # Back the same sorts of active listings only, so active=true is the
+            # index's predicate rather than a filter over closed listings
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="active_created_at_idx",
+                condition=models.Q(active=True),
+            ),
+            *[
+                models.Index(
+                    fields=[field, "id"],
+                    name=f"active_{field}_idx",
+                    condition=models.Q(active=True),
+                )
+                for field in ("price", "highest_bid", "bids_count", "closing_date")
+            ],
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                name="active_cat_created_at_idx",
+                condition=models.Q(active=True),
+            ),
+            *[
+                models.Index(
+                    fields=["category", field, "id"],
+                    name=f"active_cat_{field}_idx",
+                    condition=models.Q(active=True),
+                )
+                for field in ("price", "highest_bid", "bids_count", "closing_date")
+            ],
+            # Backs full-text search of listings
+            GinIndex(fields=["search_vector"], name="listing_search_vector_idx"),
+        ]
 
 
 class Bid(BaseModel):
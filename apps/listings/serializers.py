@@ -1,3 +1,4 @@
+from django.db import models
 from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from django.utils.translation import gettext_lazy as _
@@ -5,9 +6,37 @@ from django.utils.translation import gettext_lazy as _
 from typing import Optional
 from rest_framework import serializers
 
+from apps.common.file_processors import FileProcessor
 from apps.common.file_types import ALLOWED_IMAGE_TYPES
+from collections import OrderedDict
+from .cache import card_cache
 import pytz
 
+# Fields that depend on the client or the current time, so they are never cached
+CARD_VOLATILE_FIELDS = (
+    "active",
+    "bids_count",
+    "highest_bid",
+    "time_left_seconds",
+    "watchlist",
+)
+
+
+class ListingListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        listings = list(data.all() if isinstance(data, models.Manager) else data)
+        # Resolve the page's image and avatar urls in one batch, handed to the child
+        # through the context. Cached cards already hold theirs
+        urls = FileProcessor.generate_file_urls(
+            file
+            for listing in listings
+            if card_cache.get(listing.id, listing.updated_at) is None
+            for file in (listing.image_file, listing.auctioneer.avatar_file)
+            if file
+        )
+        self.context["file_urls"] = urls
+        return super().to_representation(listings)
+
 
 class ListingSerializer(serializers.Serializer):
     auctioneer = serializers.SerializerMethodField()
@@ -29,23 +58,61 @@ class ListingSerializer(serializers.Serializer):
     watchlist = serializers.SerializerMethodField(read_only=True)
     file_type = serializers.CharField(write_only=True)
 
+    class Meta:
+        list_serializer_class = ListingListSerializer
+
+    def to_representation(self, instance):
+        # Serve the static part of the listing card from cache and overlay the rest
+        card = card_cache.get(instance.id, instance.updated_at)
+        if card is None:
+            generation = card_cache.generation
+            data = super().to_representation(instance)
+            card_cache.set(
+                instance.id,
+                instance.updated_at,
+                {
+                    key: value
+                    for key, value in data.items()
+                    if key not in CARD_VOLATILE_FIELDS
+                },
+                generation=generation,
+            )
+            return data
+
+        data = OrderedDict()
+        for field in self._readable_fields:
+            name = field.field_name
+            if name in card:
+                data[name] = card[name]
+                continue
+            attribute = field.get_attribute(instance)
+            data[name] = (
+                None if attribute is None else field.to_representation(attribute)
+            )
+        return data
+
+    def file_url(self, file):
+        # From the urls resolved for the whole list, if any
+        if not file:
+            return None
+        key, folder, content_type = file
+        url = self.context.get("file_urls", {}).get((str(key), folder, content_type))
+        return url or FileProcessor.generate_file_url(*file)
+
     def get_auctioneer(self, obj) -> dict:
         auctioneer = obj.auctioneer
         return {
             "id": auctioneer.id,
             "name": auctioneer.full_name,
-            "avatar": auctioneer.get_avatar,
+            "avatar": self.file_url(auctioneer.avatar_file),
         }
 
     def get_image(self, obj) -> str:
-        return obj.get_image
+        return self.file_url(obj.image_file)
 
     def get_watchlist(self, obj) -> bool:
-        client = self.context["client"]
-        watchlist_status = False
-        if client:
-            watchlist_status = True if len(obj.watchlist) > 0 else False
-        return watchlist_status
+        # Annotated by Listing.objects.with_watch_status()
+        return obj.watchlist
 
     def get_active(self, obj) -> bool:
         if obj.active and obj.time_left_seconds > 0:
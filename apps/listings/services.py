@@ -0,0 +1,104 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from apps.common.exceptions import RequestError
+from apps.common.models import GuestUser
+from .models import Bid, Listing, WatchList
+from asgiref.sync import sync_to_async
+import uuid
+
+UPSERT_BID_SQL = f"""
+    INSERT INTO {Bid._meta.db_table} (id, created_at, updated_at, user_id, listing_id, amount)
+    VALUES (%s, NOW(), NOW(), %s, %s, %s)
+    ON CONFLICT (user_id, listing_id)
+    DO UPDATE SET amount = EXCLUDED.amount, updated_at = EXCLUDED.updated_at
+    RETURNING id, (xmax = 0) AS inserted
+"""
+
+MERGE_GUEST_WATCHLISTS_SQL = f"""
+    INSERT INTO {WatchList._meta.db_table} (id, created_at, updated_at, user_id, listing_id)
+    SELECT gen_random_uuid(), created_at, updated_at, %s, listing_id
+    FROM {WatchList._meta.db_table}
+    WHERE guest_id = %s
+    ON CONFLICT ON CONSTRAINT unique_user_listing_watchlists DO NOTHING
+"""
+
+
+def check_bid(listing, user, amount):
+    """Raises the error a bid would get against the given listing state"""
+    if user.id == listing.auctioneer_id:
+        raise RequestError(err_msg="You cannot bid your own product!", status_code=403)
+    elif not listing.active:
+        raise RequestError(err_msg="This auction is closed!", status_code=410)
+    elif listing.time_left < 1:
+        raise RequestError(
+            err_msg="This auction is expired and closed!", status_code=410
+        )
+    elif amount < listing.price:
+        raise RequestError(err_msg="Bid amount cannot be less than the bidding price!")
+    elif amount <= listing.highest_bid:
+        raise RequestError(err_msg="Bid amount must be more than the highest bid!")
+
+
+def place_bid(listing, user, amount):
+    """
+    Places or raises the user's bid on a listing and refreshes the listing's bid totals.
+    A conditional UPDATE on the listing row is the only gate: it validates the amount
+    against the current highest bid and locks the row, so concurrent bidders on the
+    same listing are applied one after the other and the losers fail cleanly.
+    """
+    check_bid(listing, user, amount)
+    try:
+        with transaction.atomic():
+            accepted = (
+                Listing.objects.filter(
+                    id=listing.id,
+                    active=True,
+                    closing_date__gt=Now(),
+                    price__lte=amount,
+                    highest_bid__lt=amount,
+                )
+                .exclude(auctioneer_id=user.id)
+                .update(highest_bid=amount, updated_at=Now())
+            )
+            if not accepted:
+                # Lost the race, report against the listing's current state
+                check_bid(Listing.objects.get(id=listing.id), user, amount)
+                raise RequestError(
+                    err_msg="Bid amount must be more than the highest bid!"
+                )
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    UPSERT_BID_SQL, [uuid.uuid4(), user.id, listing.id, amount]
+                )
+                bid_id, inserted = cursor.fetchone()
+            if inserted:
+                Listing.objects.filter(id=listing.id).update(
+                    bids_count=F("bids_count") + 1
+                )
+            listing.highest_bid, listing.bids_count = Listing.objects.values_list(
+                "highest_bid", "bids_count"
+            ).get(id=listing.id)
+    except IntegrityError:
+        # An amount already taken by a bid created outside this path
+        raise RequestError(err_msg="Bid amount must be more than the highest bid!")
+
+    return Bid(id=bid_id, user=user, listing_id=listing.id, amount=amount)
+
+
+def merge_guest_watchlists(user_id, guest_id):
+    """
+    Copies a guest's watchlist onto the user, skipping listings the user already watches,
+    then deletes the guest with its watchlist. Returns how many listings were added.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(MERGE_GUEST_WATCHLISTS_SQL, [user_id, guest_id])
+            merged = cursor.rowcount
+        GuestUser.objects.filter(id=guest_id).delete()
+    return merged
+
+
+async def amerge_guest_watchlists(user_id, guest_id):
+    return await sync_to_async(merge_guest_watchlists)(user_id, guest_id)
@@ -0,0 +1,58 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from apps.accounts.models import User
+from apps.common.models import File
+from .cache import card_cache
+from .categories import adjust_active_listings_counts, category_registry
+from .models import Category, Listing
+
+
+def invalidate_cards(*conditions):
+    listing_ids = Listing.objects.filter(*conditions).values_list("id", flat=True)
+    card_cache.delete_many(list(listing_ids))
+
+
+@receiver(post_save, sender=Listing)
+def listing_saved(sender, instance, created, **kwargs):
+    card_cache.delete_many([instance.id])
+    if created:
+        adjust_active_listings_counts(added=[instance.counted_category_id])
+    elif hasattr(instance, "_counted_category_id"):
+        adjust_active_listings_counts(
+            added=[instance.counted_category_id],
+            removed=[instance._counted_category_id],
+        )
+    instance._counted_category_id = instance.counted_category_id
+
+
+@receiver(post_delete, sender=Listing)
+def listing_deleted(sender, instance, **kwargs):
+    card_cache.delete_many([instance.id])
+    adjust_active_listings_counts(
+        removed=[
+            getattr(instance, "_counted_category_id", instance.counted_category_id)
+        ]
+    )
+
+
+@receiver(post_save, sender=User)
+def auctioneer_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_cards(Q(auctioneer_id=instance.id))
+
+
+@receiver(post_save, sender=File)
+@receiver(pre_delete, sender=File)
+def file_changed(sender, instance, created=False, **kwargs):
+    # Image and avatar urls depend on the file's resource type
+    if not created:
+        invalidate_cards(Q(image_id=instance.id) | Q(auctioneer__avatar_id=instance.id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, created=False, **kwargs):
+    category_registry.invalidate_on_commit()
+    if not created:
+        invalidate_cards(Q(category_id=instance.id))
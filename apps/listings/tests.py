@@ -1,11 +1,30 @@
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from apps.accounts.auth import Authentication
 from apps.accounts.models import Jwt
 
 from apps.common.utils import TestUtil
+from django.utils import timezone
 from unittest import mock
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from decimal import Decimal
+import base64, json
 
-from apps.listings.models import Bid, WatchList
+from apps.common.broadcast import broadcast
+from apps.common.exceptions import RequestError
+from apps.common.file_processors import FileProcessor, file_url_cache
+from apps.common.paginators import CursorPaginator
+from apps.listings.cache import card_cache
+from apps.listings.closing import AuctionCloser
+from apps.listings.events import bid_hub
+from apps.listings.filters import SORT_FIELDS, ListingFilters
+from apps.listings.models import Bid, Category, Listing, WatchList
+from apps.listings.services import place_bid
 
 
 class TestListings(APITestCase):
@@ -32,6 +51,267 @@ class TestListings(APITestCase):
         self.assertGreater(len(data), 0)
         self.assertTrue(any(isinstance(obj["name"], str) for obj in data))
 
+    def test_retrieve_all_listings_watch_status(self):
+        WatchList.objects.create(
+            user_id=self.verified_user.id, listing_id=self.listing.id
+        )
+        bearer = {"HTTP_AUTHORIZATION": f"Bearer {self.auth_token}"}
+
+        # Verify that the watch status comes with the listings in a single query
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.listings_url, **bearer)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(obj["watchlist"] for obj in response.json()["data"]))
+        self.assertFalse(
+            any(
+                query["sql"].startswith('SELECT "listings_watchlist"')
+                for query in ctx.captured_queries
+            )
+        )
+
+        # Verify that listings are not watched for an anonymous client
+        response = self.client.get(self.listings_url)
+        self.assertFalse(any(obj["watchlist"] for obj in response.json()["data"]))
+
+    def test_listing_card_cache(self):
+        listing = self.listing
+        url = f"{self.listing_detail_url}{listing.slug}/"
+        with mock.patch(
+            "apps.listings.models.FileProcessor.generate_file_url",
+            return_value="https://img.url",
+        ) as generate_file_url:
+            # Verify that the listing card is built once and served from cache afterwards
+            response = self.client.get(url)
+            self.assertEqual(
+                response.json()["data"]["listing"]["image"], "https://img.url"
+            )
+            self.assertEqual(generate_file_url.call_count, 1)
+            response = self.client.get(url)
+            self.assertEqual(
+                response.json()["data"]["listing"]["image"], "https://img.url"
+            )
+            self.assertEqual(generate_file_url.call_count, 1)
+
+            # Verify that volatile fields are still read from the listing
+            Listing.objects.filter(id=listing.id).update(bids_count=5)
+            response = self.client.get(url)
+            self.assertEqual(response.json()["data"]["listing"]["bids_count"], 5)
+
+            # Verify that saving the category invalidates the card
+            category = listing.category
+            category.name = "RenamedCategory"
+            category.save()
+            response = self.client.get(url)
+            self.assertEqual(
+                response.json()["data"]["listing"]["category"], "RenamedCategory"
+            )
+            self.assertEqual(generate_file_url.call_count, 2)
+
+            # Verify that evictions published by other workers are applied
+            self.client.get(url)
+            self.assertEqual(generate_file_url.call_count, 2)
+            broadcast.publish(card_cache.channel, {"listing_ids": [str(listing.id)]})
+            self.client.get(url)
+            self.assertEqual(generate_file_url.call_count, 3)
+
+            # Verify that a card built while an eviction happens isn't cached
+            generation = card_cache.generation
+            card_cache.delete_many([listing.id])
+            card_cache.set(listing.id, listing.updated_at, {}, generation=generation)
+            self.assertIsNone(card_cache.get(listing.id, listing.updated_at))
+
+    def test_retrieve_listings_with_quantity(self):
+        # Verify that the quantity is applied as a LIMIT in SQL
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.listings_url, {"quantity": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 1)
+        listing_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if 'FROM "listings_listing"' in query["sql"]
+        ]
+        self.assertTrue(all("LIMIT 1" in sql for sql in listing_queries))
+
+        # Verify that an invalid quantity fails
+        response = self.client.get(self.listings_url, {"quantity": "invalid"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_retrieve_listings_with_cursor(self):
+        listing = self.listing
+        for idx in range(4):
+            Listing.objects.create(
+                auctioneer_id=self.verified_user.id,
+                name=f"Paged Listing {idx}",
+                desc="Paged description",
+                category_id=listing.category_id,
+                price=1000.00,
+                closing_date=listing.closing_date,
+            )
+
+        # Verify that the first page is limited and has only a next cursor
+        response = self.client.get(f"{self.listings_url}?limit=2")
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["message"], "Listings fetched")
+        self.assertEqual(len(result["data"]), 2)
+        self.assertIsNone(result["pagination"]["previous"])
+        first_page = [obj["slug"] for obj in result["data"]]
+
+        # Verify that following cursors walks every listing exactly once
+        slugs = list(first_page)
+        cursor = result["pagination"]["next"]
+        while cursor:
+            response = self.client.get(
+                self.listings_url, {"limit": 2, "cursor": cursor}
+            )
+            self.assertEqual(response.status_code, 200)
+            result = response.json()
+            slugs += [obj["slug"] for obj in result["data"]]
+            cursor = result["pagination"]["next"]
+        self.assertEqual(len(slugs), 5)
+        self.assertEqual(len(set(slugs)), 5)
+
+        # Verify that the previous cursor returns to the earlier page
+        response = self.client.get(
+            self.listings_url, {"limit": 2, "cursor": result["pagination"]["previous"]}
+        )
+        self.assertEqual([obj["slug"] for obj in response.json()["data"]], slugs[2:4])
+
+        # Verify that an invalid cursor fails
+        response = self.client.get(self.listings_url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            response.json(), {"status": "failure", "message": "Invalid cursor"}
+        )
+
+        # Verify that cursors with malformed positions fail
+        for position in ([{"a": 1}, "y"], ["not a date", "not a uuid"], [None, "y"]):
+            payload = {"o": "-created_at,-id", "p": position, "r": False}
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.client.get(self.listings_url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(
+                response.json(), {"status": "failure", "message": "Invalid cursor"}
+            )
+
+        # Verify that a cursor can't be reused with another sort
+        cursor = result["pagination"]["previous"]
+        for sort in ("-bids_count", "price", "created_at"):
+            response = self.client.get(
+                self.listings_url, {"limit": 2, "sort": sort, "cursor": cursor}
+            )
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(
+                response.json(), {"status": "failure", "message": "Invalid cursor"}
+            )
+        response = self.client.get(self.listings_url, {"limit": 2, "sort": "price"})
+        response = self.client.get(
+            self.listings_url,
+            {
+                "limit": 2,
+                "sort": "-price",
+                "cursor": response.json()["pagination"]["next"],
+            },
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_listings_cursor_uses_index(self):
+        call_command(
+            "generate_load_data",
+            users=20,
+            categories=2,
+            listings=3000,
+            bids=0,
+            watchlists=0,
+            seed=1,
+        )
+        paginator = CursorPaginator(ordering=("-created_at", "-id"))
+        listings = Listing.objects.with_watch_status(None).select_related(
+            "auctioneer", "auctioneer__avatar", "category", "image"
+        )
+        middle = listings.order_by("-created_at", "-id")[1500]
+
+        # Verify that pages deep into the feed seek the index in both directions
+        for reverse, ordering in (
+            (False, ("-created_at", "-id")),
+            (True, ("created_at", "id")),
+        ):
+            position, reverse = paginator.decode_cursor(
+                paginator.encode_cursor(middle, reverse=reverse)
+            )
+            plan = (
+                listings.filter(paginator.keyset_filter(position, reverse))
+                .order_by(*ordering)[:21]
+                .explain()
+            )
+            self.assertIn("using listing_created_at_id_idx", plan, plan)
+            self.assertIn(
+                f"Index Cond: (created_at {'>=' if reverse else '<='}", plan, plan
+            )
+
+    def test_search_listings(self):
+        listing = self.listing
+        for idx, (name, desc) in enumerate(
+            [
+                ("Vintage Camera", "Film camera in good condition"),
+                ("Camera Lens", "Fits most cameras"),
+                ("Leather Bag", "Room for a camera"),
+                ("Vintage Watch", "Still ticking"),
+            ]
+        ):
+            Listing.objects.create(
+                auctioneer_id=self.verified_user.id,
+                name=name,
+                desc=desc,
+                category_id=listing.category_id,
+                price=1000.00,
+                closing_date=listing.closing_date,
+            )
+        search_url = f"{self.listings_url}search/"
+
+        # Verify that matches in names rank above matches in descriptions
+        response = self.client.get(search_url, {"q": "cameras"})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["message"], "Listings fetched")
+        names = [obj["name"] for obj in result["data"]]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[-1], "Leather Bag")
+        self.assertEqual(
+            set(result["data"][0]),
+            set(self.client.get(self.listings_url).json()["data"][0]),
+        )
+
+        # Verify that search syntax and cursors are supported
+        response = self.client.get(search_url, {"q": "vintage -watch"})
+        self.assertEqual(
+            [obj["name"] for obj in response.json()["data"]], ["Vintage Camera"]
+        )
+        slugs, cursor = [], None
+        while True:
+            params = {"q": "camera", "limit": 1}
+            if cursor:
+                params["cursor"] = cursor
+            result = self.client.get(search_url, params).json()
+            slugs += [obj["slug"] for obj in result["data"]]
+            cursor = result["pagination"]["next"]
+            if not cursor:
+                break
+        self.assertEqual(len(slugs), 3)
+        self.assertEqual(len(set(slugs)), 3)
+
+        # Verify that edits are searchable and an empty search fails
+        listing.desc = "Tripod for a camera"
+        listing.save()
+        response = self.client.get(search_url, {"q": "tripod"})
+        self.assertEqual(response.json()["data"][0]["slug"], listing.slug)
+        response = self.client.get(search_url, {"q": " "})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            response.json(), {"status": "failure", "message": "Enter a search text"}
+        )
+
     def test_retrieve_particular_listng(self):
         listing = self.listing
         # Verify that a particular listing retrieval fails with an invalid slug
@@ -74,6 +354,52 @@ class TestListings(APITestCase):
             },
         )
 
+    def test_conditional_get(self):
+        listing = self.listing
+        urls = (
+            f"{self.listing_detail_url}{listing.slug}/",
+            f"{self.listing_detail_url}{listing.slug}/bids/",
+            self.categories_url,
+        )
+        etags = {}
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers["ETag"]
+            self.assertTrue(etag.startswith('W/"'))
+
+            # Verify that an unchanged resource is answered with an empty 304
+            with mock.patch(
+                "apps.listings.views.ListingDetailSerializer"
+            ) as detail_serializer, mock.patch(
+                "apps.listings.views.BidSerializer"
+            ) as bid_serializer:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"x", {etag}')
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(response.headers["ETag"], etag)
+            detail_serializer.assert_not_called()
+            bid_serializer.assert_not_called()
+            etags[url] = etag
+
+        # Verify that a bid changes the listing and bids etags but not the categories'
+        place_bid(listing, TestUtil.another_verified_user(), Decimal("2000.00"))
+        for url, changed in zip(urls, (True, True, False)):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200 if changed else 304)
+
+        # Verify that the watch status is part of the listing's etag
+        url = urls[0]
+        etag = self.client.get(url).headers["ETag"]
+        WatchList.objects.create(user_id=self.verified_user.id, listing_id=listing.id)
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=etag,
+            HTTP_AUTHORIZATION=f"Bearer {self.auth_token}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["data"]["listing"]["watchlist"])
+
     def test_get_user_watchlists_listng(self):
         listing = self.listing
         user_id = self.verified_user.id
@@ -132,6 +458,34 @@ class TestListings(APITestCase):
         self.assertGreater(len(data), 0)
         self.assertTrue(any(isinstance(obj["name"], str) for obj in data))
 
+        # Verify that the catalogue is served from memory with active listing counts
+        category = self.listing.category
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.categories_url)
+        self.assertEqual(len(queries), 0)
+        catalogue = {obj["slug"]: obj for obj in response.json()["data"]}
+        self.assertEqual(catalogue[category.slug]["active_listings_count"], 1)
+
+        # Verify that counts follow listings moving category and closing
+        other_category = Category.objects.create(name="OtherCategory")
+        listing = Listing.objects.get(id=self.listing.id)
+        listing.category = other_category
+        listing.save()
+        response = self.client.get(self.categories_url)
+        catalogue = {obj["slug"]: obj for obj in response.json()["data"]}
+        self.assertEqual(catalogue[category.slug]["active_listings_count"], 0)
+        self.assertEqual(catalogue[other_category.slug]["active_listings_count"], 1)
+
+        Listing.objects.filter(id=listing.id).update(
+            closing_date=timezone.now() - timedelta(seconds=5)
+        )
+        closer = AuctionCloser()
+        closer.refresh()
+        closer.close_due()
+        response = self.client.get(self.categories_url)
+        catalogue = {obj["slug"]: obj for obj in response.json()["data"]}
+        self.assertEqual(catalogue[other_category.slug]["active_listings_count"], 0)
+
     def test_retrieve_all_listings_by_category(self):
         slug = self.listing.category.slug
 
@@ -152,6 +506,145 @@ class TestListings(APITestCase):
         self.assertGreater(len(data), 0)
         self.assertTrue(any(isinstance(obj["name"], str) for obj in data))
 
+    def test_filter_and_sort_listings(self):
+        listing = self.listing
+        for idx in range(4):
+            Listing.objects.create(
+                auctioneer_id=self.verified_user.id,
+                name=f"Sorted Listing {idx}",
+                desc="Sorted description",
+                category_id=listing.category_id,
+                price=100 * (idx + 1),
+                bids_count=idx,
+                closing_date=timezone.now() + timedelta(hours=idx * 10 + 1),
+                active=idx != 3,
+            )
+
+        # Verify that listings are filtered and sorted in both feeds
+        params = {"min_price": 150, "max_price": 350, "sort": "-price"}
+        for url in (
+            self.listings_url,
+            f"{self.categories_url}{listing.category.slug}/",
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [obj["price"] for obj in response.json()["data"]], ["300.00", "200.00"]
+            )
+        response = self.client.get(
+            self.listings_url, {"closing_within": 15, "active": "true"}
+        )
+        self.assertEqual(
+            [obj["name"] for obj in response.json()["data"]],
+            ["Sorted Listing 0", "Sorted Listing 1"],
+        )
+        response = self.client.get(self.listings_url, {"min_bids": 1, "limit": 2})
+        result = response.json()
+        self.assertEqual([obj["bids_count"] for obj in result["data"]], [3, 2])
+        response = self.client.get(
+            self.listings_url,
+            {"min_bids": 1, "limit": 2, "cursor": result["pagination"]["next"]},
+        )
+        self.assertEqual([obj["bids_count"] for obj in response.json()["data"]], [1])
+
+        # Verify that invalid params and combinations no index serves are rejected
+        for params, message in (
+            ({"sort": "name"}, "Invalid sort"),
+            ({"min_price": "abc"}, "Invalid min_price params"),
+            ({"closing_within": "nan"}, "Invalid closing_within params"),
+            ({"active": "yes"}, "Invalid active params"),
+            ({"active": "false"}, "Filtering by inactive listings isn't supported"),
+            (
+                {"min_price": 100, "sort": "-bids_count"},
+                "Filtering by price requires sorting by price",
+            ),
+            (
+                {"min_price": 100, "min_bids": 1},
+                "Filtering by min_bids can't be combined with other ranges",
+            ),
+        ):
+            response = self.client.get(self.listings_url, params)
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(response.json(), {"status": "failure", "message": message})
+
+    def test_listing_sorts_use_indexes(self):
+        # Enough listings for the planner to pick the indexes on its own
+        call_command(
+            "generate_load_data",
+            users=20,
+            categories=2,
+            listings=3000,
+            bids=3000,
+            watchlists=0,
+            seed=1,
+        )
+        category = (
+            Category.objects.annotate(total=Count("listing")).order_by("-total").first()
+        )
+        feeds = {
+            "listing": Listing.objects.all(),
+            "listing_cat": Listing.objects.filter(category_id=category.id),
+        }
+        params = {
+            "price": {"min_price": 10},
+            "bids_count": {"max_bids": 10},
+            "closing_date": {"closing_within": 24 * 30},
+        }
+        cases = [
+            (field, sort, prefix, active)
+            for field in SORT_FIELDS
+            for sort in (field, f"-{field}")
+            for prefix in feeds
+            for active in (None, "true")
+        ]
+        for field, sort, prefix, active in cases:
+            index = f"{prefix}_{field}_idx"
+            if prefix == "listing":
+                index = f"{prefix}_{field}_id_idx"
+            if active:
+                index = index.replace("listing", "active").replace("_id_idx", "_idx")
+            listing_filters = ListingFilters(
+                {"sort": sort, "active": active, **params.get(field, {})}
+            )
+            paginator = listing_filters.paginator
+            listings = listing_filters.apply(
+                feeds[prefix]
+                .with_watch_status(None)
+                .select_related("auctioneer", "auctioneer__avatar", "category", "image")
+            ).order_by(*listing_filters.ordering)
+            middle = listings[listings.count() // 2]
+            position, reverse = paginator.decode_cursor(paginator.encode_cursor(middle))
+            after = listings.filter(paginator.keyset_filter(position, reverse))
+            pages = {"first": listings[:21], "cursor": after[:21]}
+            for page, queryset in pages.items():
+                plan = queryset.explain()
+                # Verify that the page is read in order from the sort's index
+                self.assertIn(f"using {index} on listings_listing", plan, plan)
+                self.assertNotIn("Sort", plan, plan)
+
+                # Conditions of the listings scan, up to the next plan node
+                scan = plan.split(f"using {index} on listings_listing")[1]
+                conditions = []
+                for line in scan.splitlines()[1:]:
+                    if "->" in line:
+                        break
+                    conditions.append(line.strip())
+                index_cond = next(
+                    (line for line in conditions if line.startswith("Index Cond")), ""
+                )
+
+                # Verify that the index is sought, not scanned from the start.
+                # Only the first page of the whole feed has nothing to seek
+                if prefix == "listing_cat":
+                    self.assertIn("category_id =", index_cond, plan)
+                if page == "cursor" or field in params:
+                    self.assertIn(f"{field} ", index_cond, plan)
+
+                # Verify that active listings come from the partial index, without
+                # skipping past closed ones
+                if active:
+                    self.assertFalse(any("active" in line for line in conditions), plan)
+
     def test_retrieve_listing_bids(self):
         listing = self.listing
         another_verified_user = TestUtil.another_verified_user()
@@ -180,6 +673,75 @@ class TestListings(APITestCase):
         data = result["data"]
         self.assertTrue(isinstance(data["listing"], str))
 
+        # Verify that the highest bids come first
+        Bid.objects.create(user=TestUtil.new_user(), listing=listing, amount=12000.00)
+        response = self.client.get(f"{self.listing_detail_url}{listing.slug}/bids/")
+        self.assertEqual(response.status_code, 200)
+        bids = response.json()["data"]["bids"]
+        self.assertEqual([bid["amount"] for bid in bids], ["12000.00", "10000.00"])
+
+    async def test_stream_listing_bids(self):
+        listing = self.listing
+
+        # Verify that the stream opens with a snapshot of the listing's bids
+        response = await self.async_client.get(
+            f"{self.listing_detail_url}{listing.slug}/bids/stream/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        self.assertEqual(
+            await anext(stream),
+            b'event: snapshot\ndata: {"listing": "New Listing", "highest_bid": "0.00", "bids_count": 0}\n\n',
+        )
+
+        # Verify that published bids are pushed to the subscriber
+        event = {
+            "bid": {"amount": "5000.00"},
+            "highest_bid": "5000.00",
+            "bids_count": 1,
+        }
+        await bid_hub.apublish(listing.id, event)
+        self.assertEqual(
+            await anext(stream),
+            b'event: bid\ndata: {"bid": {"amount": "5000.00"}, "highest_bid": "5000.00", "bids_count": 1}\n\n',
+        )
+        await stream.aclose()
+
+    async def test_stream_listings(self):
+        listing = self.listing
+        for idx in range(4):
+            await Listing.objects.acreate(
+                auctioneer_id=self.verified_user.id,
+                name=f"Streamed Lïsting {idx}\u2028",
+                desc="Streamed description",
+                category_id=listing.category_id,
+                price=1000.00,
+                closing_date=listing.closing_date,
+            )
+        urls = (
+            self.listings_url,
+            f"{self.categories_url}{(await Category.objects.afirst()).slug}/",
+        )
+
+        with override_settings(STREAMING_CHUNK_SIZE=2), mock.patch(
+            "apps.listings.models.timezone.now", return_value=timezone.now()
+        ):
+            for url in urls:
+                # Verify that streamed bytes match the response built in memory
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.streaming)
+                self.assertEqual(response["Content-Type"], "application/json")
+                chunks = [chunk async for chunk in response.streaming_content]
+                self.assertEqual(len(chunks), 5)
+
+                response = await sync_to_async(self.client.get)(url)
+                self.assertFalse(response.streaming)
+                self.assertEqual(b"".join(chunks), response.content)
+                self.assertEqual(len(response.json()["data"]), 5)
+
     def test_create_bid(self):
         listing = self.listing
 
@@ -240,13 +802,15 @@ class TestListings(APITestCase):
             },
         )
 
-        # Verify that the bid was created successfully
-        response = self.client.post(
-            f"{self.listing_detail_url}{listing.slug}/bids/",
-            data={"amount": 10000},
-            **bearer,
-        )
+        # Verify that the bid was created successfully and published
+        with mock.patch.object(bid_hub, "apublish") as publish:
+            response = self.client.post(
+                f"{self.listing_detail_url}{listing.slug}/bids/",
+                data={"amount": 10000},
+                **bearer,
+            )
         self.assertEqual(response.status_code, 201)
+        publish.assert_awaited_once()
         self.assertEqual(
             response.json(),
             {
@@ -260,3 +824,122 @@ class TestListings(APITestCase):
         )
 
         # You can also test for other error responses.....
+
+    def test_place_bid_with_stale_listing(self):
+        listing = self.listing
+        bidder = TestUtil.another_verified_user()
+        stale_listing = Listing.objects.get(id=listing.id)
+
+        # Verify that a bid is placed and counted
+        place_bid(listing, bidder, Decimal("5000.00"))
+        listing.refresh_from_db()
+        self.assertEqual(listing.highest_bid, Decimal("5000.00"))
+        self.assertEqual(listing.bids_count, 1)
+
+        # Verify that a bid validated against a stale read fails cleanly
+        with self.assertRaises(RequestError) as ctx:
+            place_bid(stale_listing, self.verified_user, Decimal("3000.00"))
+        self.assertEqual(ctx.exception.status_code, 403)
+        with self.assertRaises(RequestError) as ctx:
+            place_bid(stale_listing, bidder, Decimal("3000.00"))
+        self.assertEqual(
+            ctx.exception.err_msg, "Bid amount must be more than the highest bid!"
+        )
+
+        # Verify that raising an existing bid updates it without recounting
+        place_bid(stale_listing, bidder, Decimal("6000.00"))
+        listing.refresh_from_db()
+        self.assertEqual(listing.highest_bid, Decimal("6000.00"))
+        self.assertEqual(listing.bids_count, 1)
+        self.assertEqual(Bid.objects.get(listing=listing).amount, Decimal("6000.00"))
+
+    def test_close_due_auctions(self):
+        listing = self.listing
+        bidder = TestUtil.another_verified_user()
+        Bid.objects.create(user=bidder, listing=listing, amount=2000.00)
+        winning_bid = Bid.objects.create(
+            user=self.verified_user, listing=listing, amount=3000.00
+        )
+        closer = AuctionCloser()
+
+        # Verify that listings are not closed before their deadline
+        closer.refresh()
+        self.assertEqual(closer.close_due(), 0)
+        listing.refresh_from_db()
+        self.assertTrue(listing.active)
+
+        # Verify that an overdue listing is closed with its highest bid as winner
+        Listing.objects.filter(id=listing.id).update(
+            closing_date=timezone.now() - timedelta(seconds=5)
+        )
+        closer.refresh()
+        self.assertEqual(closer.close_due(), 1)
+        listing.refresh_from_db()
+        self.assertFalse(listing.active)
+        self.assertEqual(listing.winning_bid_id, winning_bid.id)
+        self.assertEqual(closer.metrics["closed"], 1)
+        self.assertGreaterEqual(closer.metrics["last_lag_seconds"], 5)
+
+        # Verify that stale entries, extended or already closed, aren't counted
+        another_listing = Listing.objects.create(
+            auctioneer_id=bidder.id,
+            name="Another Listing",
+            desc="Another description",
+            price=1000.00,
+            closing_date=timezone.now() + timedelta(days=1),
+        )
+        Listing.objects.filter(id__in=[listing.id, another_listing.id]).update(
+            active=True, closing_date=timezone.now() - timedelta(seconds=5)
+        )
+        closer.refresh()
+        Listing.objects.filter(id=listing.id).update(
+            closing_date=timezone.now() + timedelta(days=1)
+        )
+        Listing.objects.filter(id=another_listing.id).update(active=False)
+        self.assertEqual(closer.close_due(), 0)
+        self.assertEqual(closer.metrics["closed"], 1)
+        listing.refresh_from_db()
+        self.assertTrue(listing.active)
+
+    def test_listings_file_urls_are_batched(self):
+        listing = self.listing
+        card_cache.delete_many([listing.id])
+        batches = []
+        generate_file_urls = FileProcessor.generate_file_urls
+
+        def recorded_generate_file_urls(files):
+            batches.append(list(files))
+            return generate_file_urls(batches[-1])
+
+        with mock.patch.object(
+            FileProcessor, "generate_file_urls", recorded_generate_file_urls
+        ), mock.patch.object(FileProcessor, "generate_file_url") as generate_file_url:
+            # Verify that the cards read the urls resolved for the whole list
+            response = self.client.get(self.listings_url)
+            self.assertTrue(
+                response.json()["data"][0]["image"].endswith(
+                    f"listings/{listing.image_id}.jpg"
+                )
+            )
+            self.assertIn((listing.image_id, "listings", "image/jpeg"), batches[-1])
+            generate_file_url.assert_not_called()
+
+            # Verify that listings with a cached card are left out of the batch
+            self.client.get(self.listings_url)
+            self.assertEqual(batches[-1], [])
+            generate_file_url.assert_not_called()
+
+    def test_file_urls_are_memoized(self):
+        listing = self.listing
+        image_file = (listing.image_id, "listings", "image/jpeg")
+        file_url_cache.clear()
+
+        # Verify that urls are built once and then served from the cache
+        with mock.patch.object(
+            FileProcessor, "build_file_url", wraps=FileProcessor.build_file_url
+        ) as build_file_url:
+            urls = FileProcessor.generate_file_urls([image_file, image_file])
+            url = FileProcessor.generate_file_url(*image_file)
+        self.assertEqual(build_file_url.call_count, 1)
+        self.assertEqual(urls, {(str(listing.image_id), "listings", "image/jpeg"): url})
+        self.assertTrue(url.endswith(f"listings/{listing.image_id}.jpg"))
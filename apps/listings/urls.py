@@ -4,9 +4,11 @@ from . import views
 
 urlpatterns = [
     path("", views.ListingsView.as_view()),
+    path("search/", views.SearchListingsView.as_view()),
     path("detail/<slug:slug>/", views.ListingDetailView.as_view()),
     path("watchlist/", views.ListingsByWatchListView.as_view()),
     path("categories/", views.CategoriesView.as_view()),
     path("categories/<slug:slug>/", views.CategoryListingsView.as_view()),
     path("detail/<slug:slug>/bids/", views.BidsView.as_view()),
+    path("detail/<slug:slug>/bids/stream/", views.BidsStreamView.as_view()),
 ]
@@ -1,14 +1,21 @@
-from django.db.models import Prefetch, Q
-from adrf.views import APIView
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
 from apps.common.exceptions import RequestError
 from apps.common.models import GuestUser
-from apps.common.responses import CustomResponse
+from apps.common.paginators import CursorPaginator
+from apps.common.responses import CustomResponse, make_etag
+from apps.common.views import APIView
 from apps.common.utils import (
     IsAuthenticatedCustom,
     IsGuestOrAuthenticatedCustom,
     is_int,
 )
-from .models import Bid, Category, Listing, WatchList
+from .categories import category_registry
+from .filters import LISTING_FILTER_PARAMETERS, ListingFilters
+from .models import Bid, Listing, WatchList
+from .events import bid_events, bid_hub
+from .services import place_bid
 from .serializers import (
     BidDataSerializer,
     BidSerializer,
@@ -16,6 +23,7 @@ from .serializers import (
     ListingSerializer,
     WatchlistCreateSerializer,
 )
+from django.http import StreamingHttpResponse
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from asgiref.sync import sync_to_async
 
@@ -26,40 +34,118 @@ class ListingsView(APIView):
 
     @extend_schema(
         summary="Retrieve all listings",
-        description="This endpoint retrieves all listings",
+        description="This endpoint retrieves all listings, filtered and sorted by the given params. Pass 'cursor' or 'limit' to get a page with next and previous cursors",
         parameters=[
             OpenApiParameter(
                 name="quantity",
                 description="Retrieve a certain amount",
                 required=False,
                 type=int,
-            )
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="Cursor from a previous page's pagination data",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Page size when paginating",
+                required=False,
+                type=int,
+            ),
+            *LISTING_FILTER_PARAMETERS,
         ],
     )
     async def get(self, request):
         client = request.user
-        listings = await sync_to_async(list)(
-            Listing.objects.select_related(
+        listing_filters = ListingFilters(request.GET)
+        listings = listing_filters.apply(
+            Listing.objects.with_watch_status(client).select_related(
                 "auctioneer", "auctioneer__avatar", "category", "image"
-            ).prefetch_related(
-                Prefetch(
-                    "watchlists",
-                    queryset=WatchList.objects.filter(
-                        Q(user_id=client.id if client else None)
-                        | Q(guest_id=client.id if client else None)
-                    ),
-                    to_attr="watchlist",
-                )
             )
         )
+        cursor = request.GET.get("cursor")
+        limit = request.GET.get("limit")
+        if cursor or limit:
+            listings, pagination = await listing_filters.paginator.paginate(
+                listings, cursor=cursor, limit=limit
+            )
+            serializer = self.serializer_class(
+                listings, many=True, context={"client": client}
+            )
+            return CustomResponse.success(
+                message="Listings fetched",
+                data=serializer.data,
+                pagination=pagination,
+            )
+
         quantity = is_int(request.GET.get("quantity"))
-        if quantity:
-            # Retrieve based on amount
-            listings = listings[:quantity]
+        return await CustomResponse.astream(
+            request,
+            message="Listings fetched",
+            queryset=listings.order_by(*listing_filters.ordering).limit(quantity),
+            serializer_class=self.serializer_class,
+            context={"client": client},
+        )
+
+
+class SearchListingsView(APIView):
+    serializer_class = ListingSerializer
+    permission_classes = (IsGuestOrAuthenticatedCustom,)
+
+    paginator = CursorPaginator(ordering=("-rank", "-id"))
+
+    @extend_schema(
+        summary="Search listings",
+        description="This endpoint searches listings by name and description, best matches first. Supports quoted phrases, 'or' and '-' exclusions",
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="Search text",
+                required=True,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="Cursor from a previous page's pagination data",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Page size",
+                required=False,
+                type=int,
+            ),
+        ],
+    )
+    async def get(self, request):
+        client = request.user
+        text = request.GET.get("q", "").strip()
+        if not text:
+            raise RequestError(err_msg="Enter a search text", status_code=422)
+
+        query = SearchQuery(text, config="english", search_type="websearch")
+        # As a double, so cursors hold ranks that compare equal to the stored ones
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        listings = (
+            Listing.objects.filter(search_vector=query)
+            .annotate(rank=rank)
+            .with_watch_status(client)
+            .select_related("auctioneer", "auctioneer__avatar", "category", "image")
+        )
+        listings, pagination = await self.paginator.paginate(
+            listings,
+            cursor=request.GET.get("cursor"),
+            limit=request.GET.get("limit"),
+        )
         serializer = self.serializer_class(
             listings, many=True, context={"client": client}
         )
-        return CustomResponse.success(message="Listings fetched", data=serializer.data)
+        return CustomResponse.success(
+            message="Listings fetched", data=serializer.data, pagination=pagination
+        )
 
 
 class ListingDetailView(APIView):
@@ -68,43 +154,42 @@ class ListingDetailView(APIView):
 
     @extend_schema(
         summary="Retrieve listing's detail",
-        description="This endpoint retrieves detail of a listing",
+        description="This endpoint retrieves detail of a listing. Answers 'If-None-Match' with 304 when unchanged",
     )
     async def get(self, request, *args, **kwargs):
         client = request.user
-        prefetch_query = Prefetch(
-            "watchlists",
-            queryset=WatchList.objects.filter(
-                Q(user_id=client.id if client else None)
-                | Q(guest_id=client.id if client else None)
-            ),
-            to_attr="watchlist",
+        listings = Listing.objects.with_watch_status(client)
+
+        # Versions of the listing and its related listings decide the etag
+        version = await listings.filter(slug=kwargs.get("slug")).versions().afirst()
+        if not version:
+            raise RequestError(err_msg="Listing does not exist!", status_code=404)
+        listing_id, category_id = version[0], version[5]
+        related_listings = listings.filter(category_id=category_id).exclude(
+            id=listing_id
         )
-        listing = (
-            await Listing.objects.select_related(
-                "auctioneer", "auctioneer__avatar", "category", "image"
-            )
-            .prefetch_related(prefetch_query)
-            .get_or_none(slug=kwargs.get("slug"))
+        related_versions = await sync_to_async(list)(
+            related_listings.versions().limit(3)
         )
+        etag = make_etag(version, related_versions)
+        not_modified = CustomResponse.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        cards = ("auctioneer", "auctioneer__avatar", "category", "image")
+        listing = await listings.select_related(*cards).get_or_none(id=listing_id)
         if not listing:
             raise RequestError(err_msg="Listing does not exist!", status_code=404)
-
-        related_listings = (
-            await sync_to_async(list)(
-                Listing.objects.filter(category_id=listing.category_id)
-                .exclude(id=listing.id)
-                .select_related("auctioneer", "auctioneer__avatar", "category", "image")
-                .prefetch_related(prefetch_query)
-            )
-        )[:3]
+        related_listings = await sync_to_async(list)(
+            related_listings.select_related(*cards).limit(3)
+        )
 
         serializer = self.serializer_class(
             {"listing": listing, "related_listings": related_listings},
             context={"client": client},
         )
         return CustomResponse.success(
-            message="Listing details fetched", data=serializer.data
+            message="Listing details fetched", data=serializer.data, etag=etag
         )
 
 
@@ -118,36 +203,21 @@ class ListingsByWatchListView(APIView):
     )
     async def get(self, request):
         client = request.user
-        watchlists = []
+        listings = []
         if client:
-            watchlists = await sync_to_async(list)(
-                WatchList.objects.filter(Q(user_id=client.id) | Q(guest_id=client.id))
-                .select_related(
-                    "user",
-                    "guest",
-                    "listing",
-                    "listing__auctioneer",
-                    "listing__auctioneer__avatar",
-                    "listing__category",
-                    "listing__image",
-                )
-                .prefetch_related(
-                    Prefetch(
-                        "listing__watchlists",
-                        queryset=WatchList.objects.filter(
-                            Q(user_id=client.id if client else None)
-                            | Q(guest_id=client.id if client else None)
-                        ),
-                        to_attr="watchlist",
-                    )
+            listings = await sync_to_async(list)(
+                Listing.objects.filter(
+                    Q(watchlists__user_id=client.id) | Q(watchlists__guest_id=client.id)
                 )
+                .with_watch_status(client)
+                .select_related("auctioneer", "auctioneer__avatar", "category", "image")
+                .order_by("-watchlists__updated_at")
             )
-        serializer_data = [
-            self.serializer_class(watchlist.listing, context={"client": client}).data
-            for watchlist in watchlists
-        ]
+        serializer = self.serializer_class(
+            listings, many=True, context={"client": client}
+        )
         return CustomResponse.success(
-            message="Watchlist Listings fetched", data=serializer_data
+            message="Watchlist Listings fetched", data=serializer.data
         )
 
     @extend_schema(
@@ -203,11 +273,18 @@ class ListingsByWatchListView(APIView):
 class CategoriesView(APIView):
     @extend_schema(
         summary="Retrieve all categories",
-        description="This endpoint retrieves all categories",
+        description="This endpoint retrieves all categories, with their number of active listings. Answers 'If-None-Match' with 304 when unchanged",
     )
     async def get(self, request):
-        categories = await sync_to_async(list)(Category.objects.values("name", "slug"))
-        return CustomResponse.success(message="Categories fetched", data=categories)
+        # Served from memory, so the etag is of the catalogue itself
+        categories = await category_registry.acatalogue()
+        etag = make_etag(categories)
+        not_modified = CustomResponse.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        return CustomResponse.success(
+            message="Categories fetched", data=categories, etag=etag
+        )
 
 
 class CategoryListingsView(APIView):
@@ -216,38 +293,61 @@ class CategoryListingsView(APIView):
 
     @extend_schema(
         summary="Retrieve all listings by category",
-        description="This endpoint retrieves all listings in a particular category. Use slug 'other' for category other",
+        description="This endpoint retrieves all listings in a particular category, filtered and sorted by the given params. Use slug 'other' for category other. Pass 'cursor' or 'limit' to get a page with next and previous cursors",
+        parameters=[
+            OpenApiParameter(
+                name="cursor",
+                description="Cursor from a previous page's pagination data",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Page size when paginating",
+                required=False,
+                type=int,
+            ),
+            *LISTING_FILTER_PARAMETERS,
+        ],
     )
     async def get(self, request, *args, **kwargs):
         client = request.user
         slug = kwargs.get("slug")
+        listing_filters = ListingFilters(request.GET)
 
         # listings with category 'other' have category column as null
         category = None
         if slug != "other":
-            category = await Category.objects.get_or_none(slug=slug)
+            category = await category_registry.aget(slug)
             if not category:
                 raise RequestError(err_msg="Invalid category", status_code=404)
 
-        listings = await sync_to_async(list)(
+        listings = listing_filters.apply(
             Listing.objects.filter(category=category)
+            .with_watch_status(client)
             .select_related("auctioneer", "auctioneer__avatar", "category", "image")
-            .prefetch_related(
-                Prefetch(
-                    "watchlists",
-                    queryset=WatchList.objects.filter(
-                        Q(user_id=client.id if client else None)
-                        | Q(guest_id=client.id if client else None)
-                    ),
-                    to_attr="watchlist",
-                )
+        )
+        cursor = request.GET.get("cursor")
+        limit = request.GET.get("limit")
+        if not (cursor or limit):
+            return await CustomResponse.astream(
+                request,
+                message="Category Listings fetched",
+                queryset=listings.order_by(*listing_filters.ordering),
+                serializer_class=self.serializer_class,
+                context={"client": client},
             )
+
+        listings, pagination = await listing_filters.paginator.paginate(
+            listings, cursor=cursor, limit=limit
         )
         serializer = self.serializer_class(
             listings, many=True, context={"client": client}
         )
         return CustomResponse.success(
-            message="Category Listings fetched", data=serializer.data
+            message="Category Listings fetched",
+            data=serializer.data,
+            pagination=pagination,
         )
 
 
@@ -256,29 +356,34 @@ class BidsView(APIView):
 
     @extend_schema(
         summary="Retrieve bids in a listing",
-        description="This endpoint retrieves at most 3 bids from a particular listing.",
+        description="This endpoint retrieves the 3 highest bids from a particular listing. Answers 'If-None-Match' with 304 when unchanged",
     )
     async def get(self, request, *args, **kwargs):
-        listing = (
-            await Listing.objects.select_related(
-                "auctioneer", "auctioneer__avatar", "category", "image"
-            )
-            .prefetch_related(
-                Prefetch(
-                    "bids",
-                    queryset=Bid.objects.select_related("user", "user__avatar"),
-                    to_attr="all_bids",
-                )
-            )
-            .get_or_none(slug=kwargs.get("slug"))
-        )
+        listing = await Listing.objects.only(
+            "id", "name", "updated_at", "bids_count"
+        ).get_or_none(slug=kwargs.get("slug"))
         if not listing:
             raise RequestError(err_msg="Listing does not exist!", status_code=404)
 
-        bids = listing.all_bids[:3]
+        # Top-N read off the (listing_id, amount) unique index, scanned backwards
+        bids = Bid.objects.filter(listing_id=listing.id).order_by("-amount").limit(3)
+        # Accepted bids bump the listing, the rest covers edits and bidders' profiles
+        bid_versions = await sync_to_async(list)(
+            bids.values_list(
+                "id", "amount", "user__updated_at", "user__avatar__updated_at"
+            )
+        )
+        etag = make_etag(
+            listing.id, listing.updated_at, listing.bids_count, bid_versions
+        )
+        not_modified = CustomResponse.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        bids = await sync_to_async(list)(bids.select_related("user", "user__avatar"))
         serializer = self.serializer_class({"listing": listing.name, "bids": bids})
         return CustomResponse.success(
-            message="Listing Bids fetched", data=serializer.data
+            message="Listing Bids fetched", data=serializer.data, etag=etag
         )
 
     @extend_schema(
@@ -289,13 +394,14 @@ class BidsView(APIView):
     async def post(self, request, *args, **kwargs):
         user = request.user
 
-        listing = (
-            await Listing.objects.select_related(
-                "auctioneer", "auctioneer__avatar", "category", "image"
-            )
-            .prefetch_related("bids")
-            .get_or_none(slug=kwargs.get("slug"))
-        )
+        listing = await Listing.objects.only(
+            "id",
+            "auctioneer_id",
+            "price",
+            "highest_bid",
+            "closing_date",
+            "active",
+        ).get_or_none(slug=kwargs.get("slug"))
         if not listing:
             raise RequestError(err_msg="Listing does not exist!", status_code=404)
 
@@ -303,39 +409,16 @@ class BidsView(APIView):
         serializer.is_valid(raise_exception=True)
         amount = serializer.validated_data["amount"]
 
-        bids_count = listing.bids_count
-        if user.id == listing.auctioneer_id:
-            raise RequestError(
-                err_msg="You cannot bid your own product!", status_code=403
-            )
-        elif not listing.active:
-            raise RequestError(err_msg="This auction is closed!", status_code=410)
-        elif listing.time_left < 1:
-            raise RequestError(
-                err_msg="This auction is expired and closed!", status_code=410
-            )
-        elif amount < listing.price:
-            raise RequestError(
-                err_msg="Bid amount cannot be less than the bidding price!"
-            )
-        elif amount <= listing.highest_bid:
-            raise RequestError(err_msg="Bid amount must be more than the highest bid!")
-
-        bid = await Bid.objects.select_related("user", "user__avatar").get_or_none(
-            user_id=user.id, listing_id=listing.id
-        )
-        if bid:
-            # Update existing bid
-            bid.amount = amount
-            await bid.asave()
-        else:
-            # Create new bid
-            bids_count += 1
-            bid = await Bid.objects.acreate(user=user, listing=listing, amount=amount)
-        listing.bids_count = bids_count
-        listing.highest_bid = amount
-        await listing.asave()
+        bid = await sync_to_async(place_bid)(listing, user, amount)
         serializer = BidDataSerializer(bid)
+        await bid_hub.apublish(
+            listing.id,
+            {
+                "bid": serializer.data,
+                "highest_bid": str(listing.highest_bid),
+                "bids_count": listing.bids_count,
+            },
+        )
         return CustomResponse.success(
             message="Bid added to listing", data=serializer.data, status_code=201
         )
@@ -346,3 +429,24 @@ class BidsView(APIView):
                 IsAuthenticatedCustom(),
             ]
         return []
+
+
+class BidsStreamView(APIView):
+    @extend_schema(
+        summary="Stream bids in a listing",
+        description="This endpoint streams a listing's new bids, highest bid and bids count as server-sent events. Use it instead of polling the bids endpoint.",
+        responses={(200, "text/event-stream"): str},
+    )
+    async def get(self, request, *args, **kwargs):
+        listing = await Listing.objects.only(
+            "id", "name", "highest_bid", "bids_count"
+        ).get_or_none(slug=kwargs.get("slug"))
+        if not listing:
+            raise RequestError(err_msg="Listing does not exist!", status_code=404)
+
+        response = StreamingHttpResponse(
+            bid_events(listing), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -21,6 +21,10 @@ ALLOWED_HOSTS = config("ALLOWED_HOSTS").split(" ")
 REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "apps.common.exceptions.custom_exception_handler",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.common.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "PAGE_SIZE": 20,
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -78,8 +82,12 @@ CORS_ALLOW_HEADERS = (
     "accept-encoding",
     "access-control-allow-origin",
     "content-disposition",
+    "if-none-match",
 )
 
+# Lets clients read the ETag of conditional GETs
+CORS_EXPOSE_HEADERS = ("etag",)
+
 CORS_ALLOWED_ORIGINS = config("CORS_ALLOWED_ORIGINS").split(" ")
 CORS_ALLOW_CREDENTIALS = True
 
@@ -360,3 +368,55 @@ FIRST_REVIEWER_PASSWORD = config("FIRST_REVIEWER_PASSWORD")
 CLOUDINARY_CLOUD_NAME = config("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = config("CLOUDINARY_API_KEY")
 CLOUDINARY_API_SECRET = config("CLOUDINARY_API_SECRET")
+
+# Serialized listing cards, per worker and evicted in all of them through the broadcast.
+# Use "shared" to keep them in the django cache named by the alias
+LISTING_CARD_CACHE_BACKEND = config("LISTING_CARD_CACHE_BACKEND", default="local")
+LISTING_CARD_CACHE_SIZE = config("LISTING_CARD_CACHE_SIZE", default=10000, cast=int)
+LISTING_CARD_CACHE_ALIAS = config("LISTING_CARD_CACHE_ALIAS", default="default")
+LISTING_CARD_CACHE_TIMEOUT = config(
+    "LISTING_CARD_CACHE_TIMEOUT", default=3600, cast=int
+)
+
+# Pub/sub between workers. Use "postgres" to share messages through LISTEN/NOTIFY
+BROADCAST_BACKEND = config("BROADCAST_BACKEND", default="local")
+BID_STREAM_HEARTBEAT_SECONDS = config(
+    "BID_STREAM_HEARTBEAT_SECONDS", default=15, cast=int
+)
+BID_STREAM_MAX_SECONDS = config("BID_STREAM_MAX_SECONDS", default=300, cast=int)
+
+# Recently validated access tokens, kept per worker
+AUTH_TOKEN_CACHE_SIZE = config("AUTH_TOKEN_CACHE_SIZE", default=10000, cast=int)
+AUTH_TOKEN_CACHE_TTL = config("AUTH_TOKEN_CACHE_TTL", default=60, cast=int)
+
+# Password hashing runs on its own threads, capped at MAX_PENDING running or queued calls
+PASSWORD_HASHER_WORKERS = config("PASSWORD_HASHER_WORKERS", default=2, cast=int)
+PASSWORD_HASHER_MAX_PENDING = config(
+    "PASSWORD_HASHER_MAX_PENDING", default=64, cast=int
+)
+
+# Where uploaded files live: "cloudinary", or "local" to keep them under MEDIA_ROOT
+FILE_STORAGE_BACKEND = config("FILE_STORAGE_BACKEND", default="cloudinary")
+LOCAL_STORAGE_BASE_URL = config(
+    "LOCAL_STORAGE_BASE_URL", default="/api/v4/media/files/"
+)
+LOCAL_STORAGE_UPLOAD_URL = config(
+    "LOCAL_STORAGE_UPLOAD_URL", default="/api/v4/media/upload/"
+)
+
+# Built media urls, kept per worker
+FILE_URL_CACHE_SIZE = config("FILE_URL_CACHE_SIZE", default=50000, cast=int)
+
+# Rows fetched, serialized and sent at a time by streamed list responses
+STREAMING_CHUNK_SIZE = config("STREAMING_CHUNK_SIZE", default=200, cast=int)
+
+# Email outbox retries, backing off exponentially from BACKOFF_SECONDS up to MAX_BACKOFF_SECONDS
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+EMAIL_OUTBOX_BACKOFF_SECONDS = config(
+    "EMAIL_OUTBOX_BACKOFF_SECONDS", default=30, cast=int
+)
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = config(
+    "EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", default=3600, cast=int
+)
+# Seconds a claimed batch stays hidden from other senders while it is being sent
+EMAIL_OUTBOX_LEASE_SECONDS = config("EMAIL_OUTBOX_LEASE_SECONDS", default=300, cast=int)
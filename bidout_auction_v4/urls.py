@@ -51,6 +51,7 @@ urlpatterns = [
     path("api/v4/general/", include("apps.general.urls")),
     path("api/v4/listings/", include("apps.listings.urls")),
     path("api/v4/auctioneer/", include("apps.auctioneer.urls")),
+    path("api/v4/media/", include("apps.common.urls")),
     path("api/v4/healthcheck/", HealthCheckView.as_view()),
     path("__debug__/", include(debug_toolbar.urls)),
 ]